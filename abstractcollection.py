@@ -3,6 +3,8 @@ File: abstractcollection.py
 Author: Ken Lambert
 """
 
+import io
+
 class AbstractCollection(object):
     """An abstract collection implementation."""
 
@@ -26,7 +28,26 @@ class AbstractCollection(object):
 
     def __str__(self):
         """Returns the string representation of self."""
-        return "[" + ", ".join(map(str, self)) + "]"
+        return self.render()
+
+    def render(self, out = None, *, max_nodes = None):
+        """Writes the string representation of self to the file-like
+        object out piece by piece, showing at most max_nodes items.
+        If out is None, returns the representation as a string.
+        The limits are keyword-only, as subclasses add their own."""
+        if out is None:
+            out = io.StringIO()
+            self.render(out, max_nodes=max_nodes)
+            return out.getvalue()
+        out.write("[")
+        for count, item in enumerate(self):
+            if count == max_nodes:
+                out.write(", ..." if count else "...")
+                break
+            if count:
+                out.write(", ")
+            out.write(str(item))
+        out.write("]")
 
     def __add__(self, other):
         """Returns a new bag containing the contents
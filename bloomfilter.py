@@ -0,0 +1,84 @@
+"""
+File: bloomfilter.py
+Counting Bloom filter
+"""
+
+from math import ceil, log
+
+
+class CountingBloomFilter(object):
+    """A probabilistic set which answers "definitely absent" or "maybe
+    present". Every slot is a small counter instead of a bit, so items
+    can be removed as well. Counters saturate at 255 and then stay."""
+
+    def __init__(self, capacity, error_rate=0.01):
+        """Creates an empty filter whose false positive rate stays at
+        about error_rate while it holds at most capacity items."""
+        if capacity < 1:
+            raise ValueError("Filter capacity must be positive.")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be in (0, 1).")
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._num_slots = ceil(-capacity * log(error_rate) / log(2) ** 2)
+        self._num_hashes = max(1, round(self._num_slots / capacity * log(2)))
+        self._counters = bytearray(self._num_slots)
+        # Lookups answered by the filter alone, and lookups
+        # it let through although the item was absent
+        self.avoided = 0
+        self.false_positives = 0
+
+    @property
+    def capacity(self):
+        """Number of items the filter is sized for"""
+        return self._capacity
+
+    @property
+    def error_rate(self):
+        """Target false positive rate"""
+        return self._error_rate
+
+    def _slots(self, item):
+        """Return the counter positions of item (double hashing)"""
+        first = hash(item)
+        second = hash((first, item)) | 1
+        return [(first + idx * second) % self._num_slots
+                for idx in range(self._num_hashes)]
+
+    def __contains__(self, item):
+        """Returns False if item is definitely absent, True if it may
+        be present."""
+        # Probe lazily, most absent items stop at the first empty slot
+        counters = self._counters
+        first = hash(item)
+        second = hash((first, item)) | 1
+        for idx in range(self._num_hashes):
+            if not counters[(first + idx * second) % self._num_slots]:
+                return False
+        return True
+
+    def add(self, item):
+        """Records item in the filter."""
+        counters = self._counters
+        for slot in self._slots(item):
+            if counters[slot] < 255:
+                counters[slot] += 1
+
+    def remove(self, item):
+        """Forgets one occurrence of item, which must have been added."""
+        counters = self._counters
+        for slot in self._slots(item):
+            if 0 < counters[slot] < 255:
+                counters[slot] -= 1
+
+    def clear(self):
+        """Forgets all items, keeping the counters of lookups."""
+        self._counters = bytearray(self._num_slots)
+
+    def stats(self):
+        """Returns a dictionary with the avoided lookups, the false
+        positives, the capacity and the target error rate."""
+        return {"avoided": self.avoided,
+                "false_positives": self.false_positives,
+                "capacity": self._capacity,
+                "error_rate": self._error_rate}
@@ -0,0 +1,18 @@
+"""
+File: bplusnode.py
+"""
+
+class BPlusNode(object):
+    """Represents a node for a B+-tree. Leaves have no children and are
+    doubly linked in key order; internal nodes hold the separator keys
+    between their children."""
+
+    def __init__(self, keys = None, children = None):
+        self.keys = keys if keys is not None else []
+        self.children = children
+        self.prev = None
+        self.next = None
+
+    def is_leaf(self):
+        """Returns True if self is a leaf."""
+        return self.children is None
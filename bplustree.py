@@ -0,0 +1,313 @@
+"""
+File: bplustree.py
+B+-tree with linked leaves
+"""
+
+from bisect import bisect_left, bisect_right, insort_right
+from abstractcollection import AbstractCollection
+from bstinterface import BSTInterface
+from bplusnode import BPlusNode
+
+
+class BPlusTree(AbstractCollection, BSTInterface):
+    """A B+-tree implementation of the binary search tree interface.
+    Every node keeps up to fanout sorted keys which are searched with
+    bisect, so a lookup visits only log(n, fanout) nodes. Items live in
+    the leaves, which are linked for ordered and range scans.
+    For separator s between children a and b, a <= s <= b holds."""
+
+    def __init__(self, source_collection=None, fanout=64):
+        """Sets the initial state of self, which includes the
+        contents of sourceCollection, if it's present.
+        fanout is the maximal number of children of a node
+        and of items in a leaf."""
+        if fanout < 4:
+            raise ValueError("fanout must be at least 4.")
+        self._fanout = fanout
+        self._min_keys = fanout // 2
+        self._min_children = (fanout + 1) // 2
+        self._root = BPlusNode()
+        AbstractCollection.__init__(self, source_collection)
+
+    @property
+    def fanout(self):
+        """Maximal number of children of a node"""
+        return self._fanout
+
+    # Accessor methods
+    def __str__(self):
+        """Returns a string representation with one line per level."""
+        lines = []
+        level = [self._root]
+        while level:
+            lines.append(" ".join(str(node.keys) for node in level))
+            if level[0].is_leaf():
+                break
+            level = [child for node in level for child in node.children]
+        return "\n".join(lines) + "\n"
+
+    def __iter__(self):
+        """Supports an inorder traversal on a view of self."""
+        leaf = self._first_leaf()
+        while leaf is not None:
+            yield from leaf.keys
+            leaf = leaf.next
+
+    def inorder(self):
+        """Supports an inorder traversal on a view of self."""
+        return iter(self)
+
+    def __contains__(self, item):
+        """Returns True if target is found or False otherwise."""
+        return self.find(item) is not None
+
+    def find(self, item):
+        """If item matches an item in self, returns the
+        matched item, or None otherwise."""
+        leaf, idx = self._lower_bound(item)
+        if leaf is not None and leaf.keys[idx] == item:
+            return leaf.keys[idx]
+        return None
+
+    def height(self):
+        """
+        Return the height of tree
+        :return: int
+        """
+        height = 0
+        node = self._root
+        while not node.is_leaf():
+            node = node.children[0]
+            height += 1
+        return height
+
+    def is_balanced(self):
+        """
+        Return True if tree is balanced, which a B+-tree always is
+        :return:
+        """
+        return True
+
+    def range_find(self, low, high):
+        """
+        Returns a list of the items in the tree, where low <= item <= high.
+        :param low:
+        :param high:
+        :return:
+        """
+        lyst = []
+        leaf, idx = self._lower_bound(low)
+        while leaf is not None:
+            keys = leaf.keys
+            end = bisect_right(keys, high, idx)
+            lyst.extend(keys[idx:end])
+            if end < len(keys):
+                break
+            leaf, idx = leaf.next, 0
+        return lyst
+
+    def successor(self, item):
+        """
+        Returns the smallest item that is larger than
+        item, or None if there is no such item.
+        """
+        node = self._root
+        while not node.is_leaf():
+            node = node.children[bisect_right(node.keys, item)]
+        idx = bisect_right(node.keys, item)
+        if idx < len(node.keys):
+            return node.keys[idx]
+        if node.next is not None:
+            return node.next.keys[0]
+        return None
+
+    def predecessor(self, item):
+        """
+        Returns the largest item that is smaller than
+        item, or None if there is no such item.
+        """
+        node = self._root
+        while not node.is_leaf():
+            node = node.children[bisect_left(node.keys, item)]
+        idx = bisect_left(node.keys, item)
+        if idx > 0:
+            return node.keys[idx - 1]
+        if node.prev is not None:
+            return node.prev.keys[-1]
+        return None
+
+    # Mutator methods
+    def clear(self):
+        """Makes self become empty."""
+        self._root = BPlusNode()
+        self._size = 0
+
+    def add(self, item):
+        """Adds item to the tree."""
+        split = self._insert(self._root, item)
+        if split is not None:
+            separator, right = split
+            self._root = BPlusNode([separator], [self._root, right])
+        self._size += 1
+
+    def remove(self, item):
+        """Precondition: item is in self.
+        Raises: KeyError if item is not in self.
+        postcondition: item is removed from self."""
+        item_removed = self._delete(self._root, item)
+        if item_removed is None:
+            raise KeyError("Item not in tree.")
+        if not self._root.is_leaf() and len(self._root.children) == 1:
+            self._root = self._root.children[0]
+        self._size -= 1
+        return item_removed
+
+    def replace(self, item, new_item):
+        """
+        If item is in self, replaces it with new_item and
+        returns the old item, or returns None otherwise."""
+        leaf, idx = self._lower_bound(item)
+        if leaf is None or leaf.keys[idx] != item:
+            return None
+        old_item = leaf.keys[idx]
+        leaf.keys[idx] = new_item
+        return old_item
+
+    def rebalance(self):
+        """A B+-tree is always balanced, so this does nothing."""
+        pass
+
+    # Helper methods
+    def _first_leaf(self):
+        """Return the leftmost leaf"""
+        node = self._root
+        while not node.is_leaf():
+            node = node.children[0]
+        return node
+
+    def _lower_bound(self, item):
+        """Return the leaf and the index of the smallest key greater or
+        equal to item, or (None, 0) if there is no such key"""
+        node = self._root
+        while not node.is_leaf():
+            node = node.children[bisect_left(node.keys, item)]
+        idx = bisect_left(node.keys, item)
+        if idx < len(node.keys):
+            return node, idx
+        # Equal keys may continue in the next leaf
+        if node.next is not None:
+            return node.next, 0
+        return None, 0
+
+    def _insert(self, node, item):
+        """Insert item under node. Returns a (separator, new right
+        sibling) pair if node had to be split, or None otherwise."""
+        if node.is_leaf():
+            insort_right(node.keys, item)
+            if len(node.keys) <= self._fanout:
+                return None
+            mid = len(node.keys) // 2
+            right = BPlusNode(node.keys[mid:])
+            del node.keys[mid:]
+            right.prev, right.next = node, node.next
+            if node.next is not None:
+                node.next.prev = right
+            node.next = right
+            return right.keys[0], right
+
+        idx = bisect_right(node.keys, item)
+        split = self._insert(node.children[idx], item)
+        if split is None:
+            return None
+        separator, right = split
+        node.keys.insert(idx, separator)
+        node.children.insert(idx + 1, right)
+        if len(node.children) <= self._fanout:
+            return None
+        mid = len(node.keys) // 2
+        separator = node.keys[mid]
+        right = BPlusNode(node.keys[mid + 1:], node.children[mid + 1:])
+        del node.keys[mid:]
+        del node.children[mid + 1:]
+        return separator, right
+
+    def _delete(self, node, item):
+        """Delete item from under node, returns the removed item or None
+        if it is absent. Children left underfull are refilled."""
+        if node.is_leaf():
+            idx = bisect_left(node.keys, item)
+            if idx < len(node.keys) and node.keys[idx] == item:
+                return node.keys.pop(idx)
+            return None
+
+        # Items equal to a separator may be on both of its sides
+        idx = bisect_left(node.keys, item)
+        while True:
+            item_removed = self._delete(node.children[idx], item)
+            if item_removed is not None:
+                self._refill(node, idx)
+                return item_removed
+            if idx < len(node.keys) and node.keys[idx] == item:
+                idx += 1
+            else:
+                return None
+
+    def _underfull(self, node):
+        """Return True if node holds too few keys or children"""
+        if node.is_leaf():
+            return len(node.keys) < self._min_keys
+        return len(node.children) < self._min_children
+
+    def _refill(self, parent, idx):
+        """Borrow from a sibling of parent's child idx or merge it with one
+        if the child is underfull"""
+        child = parent.children[idx]
+        if not self._underfull(child):
+            return
+        left = parent.children[idx - 1] if idx > 0 else None
+        right = parent.children[idx + 1] \
+            if idx + 1 < len(parent.children) else None
+
+        if left is not None and self._can_lend(left):
+            if child.is_leaf():
+                child.keys.insert(0, left.keys.pop())
+                parent.keys[idx - 1] = child.keys[0]
+            else:
+                child.keys.insert(0, parent.keys[idx - 1])
+                parent.keys[idx - 1] = left.keys.pop()
+                child.children.insert(0, left.children.pop())
+        elif right is not None and self._can_lend(right):
+            if child.is_leaf():
+                child.keys.append(right.keys.pop(0))
+                parent.keys[idx] = right.keys[0]
+            else:
+                child.keys.append(parent.keys[idx])
+                parent.keys[idx] = right.keys.pop(0)
+                child.children.append(right.children.pop(0))
+        elif left is not None:
+            self._merge(parent, idx - 1)
+        elif right is not None:
+            self._merge(parent, idx)
+
+    def _can_lend(self, node):
+        """Return True if node stays full enough after giving away
+        one key"""
+        if node.is_leaf():
+            return len(node.keys) > self._min_keys
+        return len(node.children) > self._min_children
+
+    @staticmethod
+    def _merge(parent, idx):
+        """Merge parent's child idx + 1 into child idx"""
+        left = parent.children[idx]
+        right = parent.children.pop(idx + 1)
+        separator = parent.keys.pop(idx)
+        if left.is_leaf():
+            left.keys.extend(right.keys)
+            left.next = right.next
+            if right.next is not None:
+                right.next.prev = left
+        else:
+            left.keys.append(separator)
+            left.keys.extend(right.keys)
+            left.children.extend(right.children)
@@ -0,0 +1,488 @@
+"""
+File: bst_benchmark.py
+
+Benchmarks comparing the binary search tree implementations
+on the words.txt dictionary.
+"""
+
+import pickle
+import sys
+import time
+from operator import attrgetter
+from random import choices, random, sample as sample_list
+from linkedbst import LinkedBST
+from splaybst import SplayBST
+from bplustree import BPlusTree
+from ternarysearchtree import TernarySearchTree
+from sharedbst import SharedBST
+
+
+def time_finds(tree, test_list):
+    """Return the seconds spent finding every item of test_list in tree"""
+    start = time.time()
+    for test in test_list:
+        tree.find(test)
+    return time.time() - start
+
+
+def zipf_sample(words_list, count, exponent=1.0):
+    """Return count words drawn with a zipfian distribution: the word
+    of popularity rank r is drawn with weight 1 / r ** exponent.
+    Popularity ranks are assigned to the words at random."""
+    ranked = sample_list(words_list, len(words_list))
+    weights = [1 / (rank ** exponent) for rank in range(1, len(ranked) + 1)]
+    return choices(ranked, weights=weights, k=count)
+
+
+def demo_skewed(path, test_words_num=100000, exponent=1.0):
+    """
+    Compare the plain, the rebalanced and the splay tree on a
+    skewed (zipfian) search workload.
+    :param path:
+    :type path:
+    :return:
+    :rtype:
+    """
+    words_list = LinkedBST.read_dict(path)
+    test_list = zipf_sample(words_list, test_words_num, exponent)
+    shuffled = sample_list(words_list, len(words_list))
+
+    print(f"Test search on {test_words_num} zipfian words "
+          f"(exponent {exponent})",
+          "------------------------",
+          sep="\n")
+
+    tree = LinkedBST(shuffled)
+    print("BST from shuffled list: " +
+          str(time_finds(tree, test_list)) + " s")
+
+    tree.rebalance()
+    print("BST rebalanced: " + str(time_finds(tree, test_list)) + " s")
+
+    tree = SplayBST(shuffled)
+    print("splay tree: " + str(time_finds(tree, test_list)) + " s")
+
+
+def time_ranges(tree, ranges, write=None):
+    """Return the seconds spent collecting every (low, high) range
+    of ranges from tree. If write is given, it is called untimed
+    before every query, so that no query is served from a view
+    cached by the previous one."""
+    total = 0
+    for low, high in ranges:
+        if write is not None:
+            write()
+        start = time.time()
+        tree.range_find(low, high)
+        total += time.time() - start
+    return total
+
+
+def rewrite(tree, item):
+    """Return a function which removes item from tree and adds it
+    back, leaving the items as they were but the tree written"""
+    def write():
+        tree.remove(item)
+        tree.add(item)
+    return write
+
+
+def demo_btree(path, test_words_num=10000, range_len=100, fanout=64):
+    """
+    Compare the rebalanced linked tree with the B+-tree on random
+    searches and on range scans of range_len words. Repeated range
+    scans of the linked tree are served from its cached sorted view,
+    so they are timed once more with a write before each of them.
+    :param path:
+    :type path:
+    :return:
+    :rtype:
+    """
+    words_list = LinkedBST.read_dict(path)
+    words_list.sort()
+    test_list = sample_list(words_list, test_words_num)
+    starts = sample_list(range(len(words_list) - range_len), test_words_num)
+    ranges = [(words_list[idx], words_list[idx + range_len - 1])
+              for idx in starts]
+    shuffled = sample_list(words_list, len(words_list))
+
+    print(f"Test search and {range_len}-word range scans "
+          f"on {test_words_num} random words",
+          "------------------------",
+          sep="\n")
+
+    tree = LinkedBST(shuffled)
+    tree.rebalance()
+    print("BST rebalanced find: " +
+          str(time_finds(tree, test_list)) + " s")
+    print("BST rebalanced range_find, sorted view cached: " +
+          str(time_ranges(tree, ranges)) + " s")
+    print("BST rebalanced range_find, first after a write: " +
+          str(time_ranges(tree, ranges, rewrite(tree, words_list[0])))
+          + " s")
+
+    tree = BPlusTree(shuffled, fanout=fanout)
+    print(f"B+-tree (fanout {fanout}) find: " +
+          str(time_finds(tree, test_list)) + " s")
+    print(f"B+-tree (fanout {fanout}) range_find: " +
+          str(time_ranges(tree, ranges)) + " s")
+
+
+def demo_prefix(path, test_prefixes_num=10000, prefix_len=3, limit=10):
+    """
+    Compare autocompletion of random prefixes: the full range_find,
+    the streaming prefix_iter of the linked tree and the ternary
+    search tree index. range_find is timed both from the cached
+    sorted view and with a write before each query.
+    :param path:
+    :type path:
+    :return:
+    :rtype:
+    """
+    words_list = LinkedBST.read_dict(path)
+    prefixes = [word[:prefix_len]
+                for word in sample_list(words_list, test_prefixes_num)]
+    shuffled = sample_list(words_list, len(words_list))
+    tree = LinkedBST(shuffled)
+    tree.rebalance()
+    index = TernarySearchTree(shuffled)
+
+    print(f"Test top-{limit} autocompletion of {test_prefixes_num} "
+          f"random {prefix_len}-letter prefixes",
+          "------------------------",
+          sep="\n")
+
+    def complete(prefix):
+        return tree.range_find(prefix, prefix + '\uffff')[:limit]
+
+    # Rows are (name, query, write called untimed before each query)
+    timings = [
+        ("BST range_find, sorted view cached", complete, None),
+        ("BST range_find, first after a write", complete,
+         rewrite(tree, words_list[0])),
+        ("BST prefix_iter", lambda prefix: list(
+            tree.prefix_iter(prefix, limit)), None),
+        ("BST prefix_count", tree.prefix_count, None),
+        ("ternary tree prefix_iter", lambda prefix: list(
+            index.prefix_iter(prefix, limit)), None),
+        ("ternary tree prefix_count", index.prefix_count, None),
+    ]
+    for name, query, write in timings:
+        total = 0
+        for prefix in prefixes:
+            if write is not None:
+                write()
+            start = time.time()
+            query(prefix)
+            total += time.time() - start
+        print(name + ": " + str(total) + " s")
+
+
+class FoldedWord(str):
+    """A word ordered case-insensitively by folding it on every
+    comparison, the way an item with a costly __lt__ behaves."""
+
+    def __lt__(self, other):
+        return self.casefold() < other.casefold()
+
+    def __eq__(self, other):
+        return self.casefold() == other.casefold()
+
+    __hash__ = str.__hash__
+
+
+class Record(object):
+    """A dictionary entry ordered by its word."""
+
+    def __init__(self, word):
+        self.word = word
+        self.length = len(word)
+
+    def __lt__(self, other):
+        return self.word < other.word
+
+    def __eq__(self, other):
+        return self.word == other.word
+
+    __hash__ = None
+
+
+def demo_key(path, test_words_num=10000):
+    """
+    Compare trees ordering their items through a comparison method
+    against trees given a key function, whose keys are computed once
+    per item and compared directly.
+    :param path:
+    :type path:
+    :return:
+    :rtype:
+    """
+    words_list = LinkedBST.read_dict(path)
+    shuffled = sample_list(words_list, len(words_list))
+    test_list = sample_list(words_list, test_words_num)
+
+    print(f"Test add and find of {len(shuffled)} words ordered "
+          f"through __lt__ and through key=",
+          "------------------------",
+          sep="\n")
+
+    cases = [
+        ("casefold __lt__", LinkedBST, FoldedWord, None),
+        ("key=str.casefold", LinkedBST, str, str.casefold),
+        ("Record __lt__", LinkedBST, Record, None),
+        ("key=attrgetter('word')", LinkedBST, Record, attrgetter("word")),
+    ]
+    for name, kind, wrap, key in cases:
+        items = [wrap(word) for word in shuffled]
+        probes = [wrap(word) for word in test_list]
+        start = time.time()
+        tree = kind(key=key)
+        for item in items:
+            tree.add(item)
+        added = time.time() - start
+        start = time.time()
+        for item in probes:
+            tree.find(item)
+        print(name + ": add " + str(added) + " s, find "
+              + str(time.time() - start) + " s")
+
+
+def demo_shared(path, test_words_num=10000):
+    """
+    Compare searching the linked tree with searching its shared memory
+    replica, attached the way a worker process would, and the cost of
+    shipping the tree to a worker by pickling instead.
+    :param path:
+    :type path:
+    :return:
+    :rtype:
+    """
+    words_list = LinkedBST.read_dict(path)
+    test_list = sample_list(words_list, test_words_num)
+    tree = LinkedBST()
+    tree.add_many(sample_list(words_list, len(words_list)))
+    tree.rebalance()
+
+    print(f"Test search of {test_words_num} random words in a tree "
+          f"and its shared memory replica",
+          "------------------------",
+          sep="\n")
+
+    start = time.time()
+    owner = tree.export_shared()
+    print("export: " + str(time.time() - start) + " s, "
+          + str(owner._shm.size) + " bytes shared")
+    start = time.time()
+    pickle.loads(pickle.dumps(tree))
+    print("pickle round trip: " + str(time.time() - start) + " s")
+
+    start = time.time()
+    replica = SharedBST(owner.name)
+    print("attach: " + str(time.time() - start) + " s")
+    for name, searched in (("linked tree", tree), ("replica", replica)):
+        start = time.time()
+        for word in test_list:
+            searched.find(word)
+        print(name + " find: " + str(time.time() - start) + " s")
+    replica.close()
+    owner.unlink()
+
+
+def demo_queue(path, test_ops_num=10000, batch=100):
+    """
+    Use the tree as a priority queue: compare peeking at the smallest
+    item through inorder() with min(), and draining it one pop_min()
+    at a time with bulk pop_min(batch).
+    :param path:
+    :type path:
+    :return:
+    :rtype:
+    """
+    words_list = LinkedBST.read_dict(path)
+    shuffled = sample_list(words_list, len(words_list))
+
+    print(f"Test priority queue operations on {len(shuffled)} words",
+          "------------------------",
+          sep="\n")
+
+    tree = LinkedBST()
+    tree.add_many(shuffled)
+    start = time.time()
+    for _ in range(test_ops_num // 100):
+        next(iter(tree.inorder()))
+    print(f"{test_ops_num // 100} inorder() peeks: "
+          + str(time.time() - start) + " s")
+    start = time.time()
+    for _ in range(test_ops_num):
+        tree.min()
+    print(f"{test_ops_num} min() peeks: " + str(time.time() - start) + " s")
+
+    start = time.time()
+    for word in shuffled[:test_ops_num]:
+        tree.pop_min()
+        tree.add(word)
+    print(f"{test_ops_num} pop_min() + add: "
+          + str(time.time() - start) + " s")
+
+    start = time.time()
+    while len(tree) >= batch:
+        for _ in range(batch):
+            tree.pop_min()
+    print("drain with pop_min(): " + str(time.time() - start) + " s")
+    tree.add_many(shuffled)
+    start = time.time()
+    while len(tree) >= batch:
+        tree.pop_min(batch)
+    print(f"drain with pop_min({batch}): " + str(time.time() - start) + " s")
+
+
+def nearest_by_neighbours(tree, item, k):
+    """Find the k items closest to item by repeated successor and
+    predecessor calls, each starting from the root."""
+    result = []
+    below = tree.predecessor(item)
+    above = item if item in tree else tree.successor(item)
+    while len(result) < k and (below is not None or above is not None):
+        if above is None or (below is not None
+                             and item - below <= above - item):
+            result.append(below)
+            below = tree.predecessor(below)
+        else:
+            result.append(above)
+            above = tree.successor(above)
+    return result
+
+
+def demo_nearest(test_queries_num=10000, numbers_num=100000, k=10):
+    """
+    Compare k-nearest queries on random numbers: repeated successor
+    and predecessor calls, nearest() and nearest_many() on the
+    sorted queries.
+    :return:
+    :rtype:
+    """
+    numbers = [random() for _ in range(numbers_num)]
+    queries = sorted(random() for _ in range(test_queries_num))
+    tree = LinkedBST()
+    tree.add_many(numbers)
+
+    print(f"Test {k}-nearest queries for {test_queries_num} random "
+          f"numbers among {numbers_num}",
+          "------------------------",
+          sep="\n")
+
+    timings = [
+        ("successor/predecessor", lambda: [
+            nearest_by_neighbours(tree, query, k) for query in queries]),
+        ("nearest", lambda: [tree.nearest(query, k) for query in queries]),
+        ("nearest_many", lambda: tree.nearest_many(queries, k)),
+    ]
+    for name, run in timings:
+        start = time.time()
+        run()
+        print(name + ": " + str(time.time() - start) + " s")
+
+
+def demo_lazy(path, threshold=0.5):
+    """
+    Compare a delete-heavy phase, removing half of the words and
+    re-adding some of them, with eager and with lazy deletion, and
+    the same removals with a min() after each of them.
+    :param path:
+    :type path:
+    :return:
+    :rtype:
+    """
+    words_list = LinkedBST.read_dict(path)
+    shuffled = sample_list(words_list, len(words_list))
+    removed = shuffled[:len(shuffled) // 2]
+    readded = removed[:len(removed) // 4]
+
+    print(f"Test removing {len(removed)} and re-adding {len(readded)} "
+          f"of {len(shuffled)} words",
+          "------------------------",
+          sep="\n")
+
+    for name, lazy in (("eager", False), (f"lazy, threshold {threshold}",
+                                          True)):
+        tree = LinkedBST()
+        tree.add_many(shuffled)
+        if lazy:
+            tree.enable_lazy_delete(threshold)
+        start = time.time()
+        for word in removed:
+            tree.remove(word)
+        for word in readded:
+            tree.add(word)
+        tree.compact()
+        print(name + ": " + str(time.time() - start) + " s")
+
+        tree = LinkedBST()
+        tree.add_many(shuffled)
+        if lazy:
+            tree.enable_lazy_delete(threshold)
+        start = time.time()
+        for word in removed:
+            tree.remove(word)
+            tree.min()
+        print(name + ", min() after each removal: "
+              + str(time.time() - start) + " s")
+
+
+def demo_views(path, test_reads_num=100, range_len=100):
+    """
+    Time repeated reads on an unchanged tree, served from the cached
+    sorted view and height, against the same reads with a write before
+    each of them.
+    :param path:
+    :type path:
+    :return:
+    :rtype:
+    """
+    words_list = sorted(LinkedBST.read_dict(path))
+    tree = LinkedBST()
+    tree.add_many(sample_list(words_list, len(words_list)))
+    starts = sample_list(range(len(words_list) - range_len), test_reads_num)
+    ranges = [(words_list[idx], words_list[idx + range_len])
+              for idx in starts]
+
+    print(f"Test {test_reads_num} repeated reads of a tree of "
+          f"{len(words_list)} words",
+          "------------------------",
+          sep="\n")
+
+    reads = [
+        ("inorder", lambda low, high: list(tree.inorder())),
+        ("is_balanced", lambda low, high: tree.is_balanced()),
+        (f"range_find of {range_len} words", tree.range_find),
+    ]
+    for name, read in reads:
+        for label, write in (("unchanged", False), ("after a write", True)):
+            start = time.time()
+            for low, high in ranges:
+                if write:
+                    tree.add(low)
+                    tree.remove(low)
+                read(low, high)
+            print(f"{name}, {label}: " + str(time.time() - start) + " s")
+
+
+if __name__ == "__main__":
+    words_path = sys.argv[1] if len(sys.argv) > 1 else 'words.txt'
+    demo_skewed(words_path)
+    print()
+    demo_btree(words_path)
+    print()
+    demo_prefix(words_path)
+    print()
+    demo_key(words_path)
+    print()
+    demo_shared(words_path)
+    print()
+    demo_queue(words_path)
+    print()
+    demo_nearest()
+    print()
+    demo_lazy(words_path)
+    print()
+    demo_views(words_path)
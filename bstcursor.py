@@ -0,0 +1,169 @@
+"""
+File: bstcursor.py
+Bidirectional cursor over a linked binary search tree
+"""
+
+
+class Cursor(object):
+    """A seekable position between two neighbouring items of a linked
+    binary search tree. next() and prev() step over one item in
+    amortized O(1), seek() repositions in O(height).
+    The cursor fails with RuntimeError if the tree is modified behind
+    its back; seek() resynchronizes it with the tree. Tombstones left
+    by lazy deletion are stepped over."""
+
+    def __init__(self, tree, seek=None):
+        """Places the cursor before the smallest item of tree, or before
+        the smallest item greater or equal to seek if it's given."""
+        self._tree = tree
+        # Path from the root to the live node whose item next() returns,
+        # empty when the cursor is past the largest item
+        self._path = []
+        if seek is None:
+            self.seek_first()
+        else:
+            self.seek(seek)
+
+    def __iter__(self):
+        """The cursor iterates forward over the remaining items."""
+        return self
+
+    def __next__(self):
+        """Supports iteration, see next()."""
+        return self.next()
+
+    def _check_version(self):
+        """Raise RuntimeError if the tree was relinked since the last seek"""
+        if self._version != self._tree._shape_version:
+            raise RuntimeError("Tree was modified during cursor scan.")
+
+    def seek_first(self):
+        """Places the cursor before the smallest item."""
+        self._version = self._tree._shape_version
+        self._path = []
+        node = self._tree._root
+        while node is not None:
+            self._path.append(node)
+            node = node.left
+        self._skip_dead()
+
+    def seek(self, item):
+        """Places the cursor before the smallest item greater
+        or equal to item."""
+        self.seek_key(self._tree._keyof(item))
+
+    def seek_key(self, key):
+        """Places the cursor before the smallest item whose key is
+        greater or equal to key."""
+        self._version = self._tree._shape_version
+        path = []
+        found = 0
+        node = self._tree._root
+        while node is not None:
+            path.append(node)
+            if node.key < key:
+                node = node.right
+            else:
+                found = len(path)
+                node = node.left
+        del path[found:]
+        self._path = path
+        self._skip_dead()
+
+    def peek(self):
+        """Returns the item next() would return without moving,
+        or None if the cursor is past the largest item."""
+        node = self._peek_node()
+        if node is None:
+            return None
+        return node.data
+
+    def _peek_node(self):
+        """Return the node after the cursor, None if there is none"""
+        self._check_version()
+        if not self._path:
+            return None
+        return self._path[-1]
+
+    def next(self):
+        """
+        Returns the item after the cursor and moves past it.
+        Raises: StopIteration if the cursor is past the largest item.
+        """
+        return self._next_node().data
+
+    def _next_node(self):
+        """Return the node after the cursor and move past it"""
+        self._check_version()
+        if not self._path:
+            raise StopIteration
+        current_node = self._path[-1]
+        self._step_forward()
+        self._skip_dead()
+        return current_node
+
+    def _step_forward(self):
+        """Move the path to the inorder successor of its last node,
+        live or not"""
+        path = self._path
+        node = path[-1]
+        if node.right is not None:
+            node = node.right
+            while node is not None:
+                path.append(node)
+                node = node.left
+        else:
+            # Climb to the nearest ancestor entered through its left link
+            idx = len(path) - 1
+            while idx > 0 and path[idx - 1].left is not path[idx]:
+                idx -= 1
+            del path[idx:]
+
+    def _skip_dead(self):
+        """Move the path forward past tombstones"""
+        while self._path and self._path[-1].dead:
+            self._step_forward()
+
+    def prev(self):
+        """
+        Moves the cursor back over the item before it and returns it.
+        Raises: StopIteration if the cursor is before the smallest item.
+        """
+        return self._prev_node().data
+
+    def _prev_node(self):
+        """Move back over the node before the cursor and return it"""
+        self._check_version()
+        while True:
+            try:
+                node = self._step_back()
+            except StopIteration:
+                # Only tombstones were passed, go forward over them again
+                self._skip_dead()
+                raise
+            if not node.dead:
+                return node
+
+    def _step_back(self):
+        """Move the path to the inorder predecessor of the node after
+        the cursor, live or not, and return it"""
+        path = self._path
+        if not path:
+            node = self._tree._root
+        elif path[-1].left is not None:
+            node = path[-1].left
+        else:
+            # Climb to the nearest ancestor entered through its right link
+            idx = len(path) - 1
+            while idx > 0 and path[idx - 1].right is not path[idx]:
+                idx -= 1
+            if idx == 0:
+                raise StopIteration
+            del path[idx:]
+            return path[-1]
+        if node is None:
+            raise StopIteration
+        while node is not None:
+            path.append(node)
+            node = node.right
+        return path[-1]
@@ -0,0 +1,188 @@
+"""
+File: bstjournal.py
+Append-only write-ahead journal for linked binary search trees
+"""
+
+import os
+import pickle
+import struct
+
+# Record types
+ADD, REMOVE, REPLACE, CLEAR, ADD_MANY, POP = range(1, 7)
+
+# Record header: type and payload length
+_RECORD = struct.Struct("<BI")
+# Journal file header: generation number
+_HEADER = struct.Struct("<Q")
+
+
+class Journal(object):
+    """Journal of the mutations of a tree kept at path, next to a sorted
+    snapshot at path + ".snapshot".
+
+    Every mutation is one binary record: a type byte, the payload length
+    and the pickled arguments. The tree writes a record before making
+    its mutation, so a mutation that fails leaves a record that fails
+    the same way on replay. Records are written through immediately
+    but fsync'ed only once per group_size records (group commit).
+    Compaction folds the journal into a new snapshot. The journal carries
+    a generation number, and the snapshot the generation it already
+    covers, so a crash halfway through compaction replays nothing twice."""
+
+    def __init__(self, path, group_size=64):
+        """Prepares the journal at path, syncing every group_size
+        records. Call replay() and then open() to use it."""
+        if group_size < 1:
+            raise ValueError("group_size must be positive.")
+        self._path = path
+        self._snapshot_path = path + ".snapshot"
+        self._group_size = group_size
+        self._pending = 0
+        self._file = None
+        # Generation covered by the snapshot, -1 if there is none
+        self._covered = -1
+        self._generation = None
+        # Length of the valid part of the journal
+        self._valid_length = 0
+
+    @property
+    def path(self):
+        """Path of the journal file"""
+        return self._path
+
+    def replay(self, tree):
+        """Loads the snapshot and the journal tail into the empty tree.
+        Consecutive additions are applied as one add_many batch."""
+        if os.path.exists(self._snapshot_path):
+            with open(self._snapshot_path, "rb") as ffile:
+                self._covered, items = pickle.load(ffile)
+            tree.add_many(items)
+
+        batch = []
+        for kind, args in self._read_records():
+            if kind == ADD:
+                batch.append(args)
+                continue
+            if kind == ADD_MANY:
+                batch.extend(args)
+                continue
+            if kind == CLEAR:
+                batch = []
+                tree.clear()
+                continue
+            if batch:
+                tree.add_many(batch)
+                batch = []
+            if kind == REMOVE:
+                try:
+                    tree.remove(args)
+                except KeyError:
+                    # Records precede their writes, this one failed
+                    pass
+            elif kind == REPLACE:
+                tree.replace(*args)
+            elif kind == POP:
+                count, largest = args
+                if largest:
+                    tree.pop_max(count)
+                else:
+                    tree.pop_min(count)
+        if batch:
+            tree.add_many(batch)
+
+    def _read_records(self):
+        """Generate the (type, arguments) records of the journal, if it
+        is newer than the snapshot, up to the first torn record"""
+        self._generation = None
+        self._valid_length = 0
+        if not os.path.exists(self._path):
+            return
+        with open(self._path, "rb") as ffile:
+            header = ffile.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return
+            self._generation, = _HEADER.unpack(header)
+            self._valid_length = _HEADER.size
+            if self._generation <= self._covered:
+                return
+            while True:
+                head = ffile.read(_RECORD.size)
+                if len(head) < _RECORD.size:
+                    return
+                kind, length = _RECORD.unpack(head)
+                payload = ffile.read(length)
+                if len(payload) < length:
+                    return
+                self._valid_length += _RECORD.size + length
+                yield kind, pickle.loads(payload)
+
+    def open(self):
+        """Opens the journal for appending after replay(). A torn tail
+        left by a crash is cut off, and a missing or already compacted
+        journal is started afresh."""
+        if self._generation is None or self._generation <= self._covered:
+            self._start(self._covered + 1)
+        else:
+            with open(self._path, "r+b") as ffile:
+                ffile.truncate(self._valid_length)
+                os.fsync(ffile.fileno())
+        self._file = open(self._path, "ab")
+
+    def write(self, records):
+        """Writes the (type, arguments) records, syncing if a group of
+        them is complete. All of them are pickled first, so arguments
+        that can't be pickled raise before anything is written."""
+        payloads = [(kind, pickle.dumps(args, pickle.HIGHEST_PROTOCOL))
+                    for kind, args in records]
+        for kind, payload in payloads:
+            self._file.write(_RECORD.pack(kind, len(payload)))
+            self._file.write(payload)
+        self._pending += len(payloads)
+        if self._pending >= self._group_size:
+            self.commit()
+
+    def commit(self):
+        """Forces the written records to disk."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def compact(self, items):
+        """Replaces the snapshot by the sorted items, which must be the
+        current contents, and starts an empty journal."""
+        self.commit()
+        self._write_atomically(self._snapshot_path,
+                               pickle.dumps((self._generation, items),
+                                            pickle.HIGHEST_PROTOCOL))
+        self._covered = self._generation
+        self._file.close()
+        self._start(self._generation + 1)
+        self._file = open(self._path, "ab")
+
+    def close(self):
+        """Syncs and closes the journal."""
+        if self._file is not None:
+            self.commit()
+            self._file.close()
+            self._file = None
+
+    def _start(self, generation):
+        """Atomically replace the journal by an empty one"""
+        self._write_atomically(self._path, _HEADER.pack(generation))
+        self._generation = generation
+
+    def _write_atomically(self, path, data):
+        """Write data to path through a synced temporary file"""
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as ffile:
+            ffile.write(data)
+            ffile.flush()
+            os.fsync(ffile.fileno())
+        os.replace(temp_path, path)
+        if hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(os.path.dirname(os.path.abspath(path)),
+                             os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
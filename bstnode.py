@@ -6,10 +6,26 @@ Author: Ken Lambert
 class BSTNode(object):
     """Represents a node for a linked binary search tree."""
 
-    def __init__(self, data, left = None, right = None):
+    # True for a node whose item was deleted lazily. Only such nodes
+    # get an instance attribute, live nodes share this default.
+    dead = False
+
+    def __init__(self, data, left = None, right = None, key = None):
         self.data = data
+        # Sort key of data, the data itself unless the tree has
+        # a key function
+        self.key = data if key is None else key
         self.left = left
         self.right = right
+        # Number of nodes in the subtree rooted at self, and how many
+        # of them are not dead
+        self.size = self.live = 1
+        if left is not None:
+            self.size += left.size
+            self.live += left.live
+        if right is not None:
+            self.size += right.size
+            self.live += right.live
 
     # def is_leaf(self):
     #     return list(self.children()) == []
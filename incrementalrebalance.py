@@ -0,0 +1,170 @@
+"""
+File: incrementalrebalance.py
+Rebalancing of a linked binary search tree in bounded steps
+"""
+
+import time
+from bisect import bisect_left, bisect_right
+from bstnode import BSTNode
+
+# Units of work done between two looks at the clock
+_CLOCK_EVERY = 64
+
+
+class IncrementalRebalance(object):
+    """Builds a balanced copy of a linked binary search tree a little at
+    a time while the tree keeps serving reads, then swaps it in.
+
+    The work runs in three phases: the items are collected in order with
+    a cursor, a balanced tree of new nodes is linked from them, and the
+    writes made meanwhile are replayed on it. Writes are reported with
+    record_add, record_remove and record_replace. A write behind the cursor is logged,
+    a write ahead of it will be met by the cursor anyway."""
+
+    def __init__(self, tree, step_time=0.001):
+        """Prepares the rebalancing of tree, doing up to step_time
+        seconds of work per step."""
+        self._tree = tree
+        self.step_time = step_time
+        self._collecting = True
+        # Key of the last collected item and how many collected
+        # items have that key
+        self._frontier = None
+        self._frontier_count = 0
+        self._started = False
+        self._log = []
+        self._work = self._run()
+
+    def record_add(self, item, key):
+        """Reports that item with the sort key key was added
+        to the tree."""
+        # Equal keys are added after the collected ones,
+        # so the cursor still meets them
+        if not self._collecting \
+                or (self._started and key < self._frontier):
+            self._log.append((True, item, key))
+
+    def record_remove(self, item, key):
+        """Reports that item with the sort key key was removed
+        from the tree."""
+        if not self._collecting:
+            self._log.append((False, item, key))
+        elif not self._started or self._frontier < key:
+            return
+        elif key < self._frontier:
+            self._log.append((False, item, key))
+        elif self._frontier_count > 0:
+            # Count it against the collected items equal to the frontier
+            # as long as there are any left
+            self._frontier_count -= 1
+            self._log.append((False, item, key))
+
+    def record_replace(self, item, new_item, key):
+        """Reports that item with the sort key key was replaced in place
+        by new_item with an equal key."""
+        # The node keeps its place, so the cursor meets new_item unless
+        # it has passed the node already. Equal keys at the frontier may
+        # be either; replaying both halves keeps the count right.
+        if not self._collecting \
+                or (self._started and not self._frontier < key):
+            self._log.append((False, item, key))
+            self._log.append((True, new_item, key))
+
+    def step(self, budget=None):
+        """Works for about budget seconds, step_time by default.
+        Returns True once the balanced tree has been swapped in."""
+        if budget is None:
+            budget = self.step_time
+        deadline = time.perf_counter() + budget
+        units = 0
+        for _ in self._work:
+            units += 1
+            if units % _CLOCK_EVERY == 0 \
+                    and time.perf_counter() >= deadline:
+                return False
+        return True
+
+    def _run(self):
+        """Generator doing the whole rebalancing, yielding after every
+        unit of work"""
+        items = []
+        keys = []
+        cursor = self._tree.cursor()
+        while True:
+            try:
+                node = cursor._next_node()
+            except StopIteration:
+                break
+            except RuntimeError:
+                # The tree changed, continue after the collected items
+                if self._started:
+                    cursor.seek_key(self._frontier)
+                    for _ in range(self._frontier_count):
+                        cursor._next_node()
+                else:
+                    cursor.seek_first()
+                yield
+                continue
+            if self._started and not self._frontier < node.key:
+                self._frontier_count += 1
+            else:
+                self._frontier = node.key
+                self._frontier_count = 1
+                self._started = True
+            items.append(node.data)
+            keys.append(node.key)
+            yield
+        self._collecting = False
+
+        # Apply the writes made behind the cursor
+        log, self._log = self._log, []
+        for added, item, key in log:
+            if added:
+                idx = bisect_right(keys, key)
+                keys.insert(idx, key)
+                items.insert(idx, item)
+            else:
+                idx = bisect_left(keys, key)
+                del keys[idx]
+                del items[idx]
+            yield
+
+        # Link a perfectly balanced tree, one node per unit; a node
+        # built from items[low:high] has high - low nodes below
+        from linkedbst import LinkedBST
+        shadow = LinkedBST(key=self._tree._key_func)
+        frames = [(0, len(items), None, False)]
+        while frames:
+            low, high, parent, is_left = frames.pop()
+            if low >= high:
+                continue
+            mid = (low + high) // 2
+            node = BSTNode(items[mid], key=keys[mid])
+            node.size = node.live = high - low
+            if parent is None:
+                shadow._root = node
+            elif is_left:
+                parent.left = node
+            else:
+                parent.right = node
+            frames.append((mid + 1, high, node, False))
+            frames.append((low, mid, node, True))
+            yield
+        shadow._size = len(items)
+
+        # Replay the writes made since the items were collected
+        replayed = 0
+        while replayed < len(self._log):
+            added, item, key = self._log[replayed]
+            if added:
+                shadow._add(item, key)
+            else:
+                shadow._remove(key)
+            replayed += 1
+            yield
+
+        # The items are unchanged but sit in new nodes
+        self._tree._root = shadow._root
+        self._tree._size = shadow._size
+        self._tree._shape_version += 1
+        self._tree._extremes_version = -1
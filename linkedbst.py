@@ -9,36 +9,120 @@ from bstnode import BSTNode
 from linkedstack import LinkedStack
 # from linkedqueue import LinkedQueue
 from math import log
+from bisect import bisect_left, bisect_right
+from copy import deepcopy
+import io
 import time
 from random import randint, sample as sample_list
 import sys
 from linked_binary_tree import BinarySearchTree
+from lrucache import LRUCache
+from bloomfilter import CountingBloomFilter
+from bstcursor import Cursor
+from incrementalrebalance import IncrementalRebalance
+from bstjournal import Journal, ADD, REMOVE, REPLACE, CLEAR, ADD_MANY, POP
+from sharedbst import SharedBST
+
+# Marks a lookup that is not in the cache
+_NOT_CACHED = object()
 
 
 class LinkedBST(AbstractCollection):
     """An link-based binary search tree implementation."""
 
-    def __init__(self, source_collection=None):
+    def __init__(self, source_collection=None, key=None):
         """Sets the initial state of self, which includes the
-        contents of sourceCollection, if it's present."""
+        contents of sourceCollection, if it's present.
+        If key is given, items are ordered by key(item), which is
+        computed once per item and kept in its node."""
         self._root = None
-        AbstractCollection.__init__(self, source_collection)
+        self._key_func = key
+        self._cache = None
+        self._bloom = None
+        self._rebuild = None
+        self._auto_step = False
+        self._journal = None
+        # Modification counter, bumped whenever the items change
+        self._version = 0
+        # Shape counter, bumped whenever nodes are relinked, which
+        # includes every change of the items. Cursors check it.
+        self._shape_version = 0
+        # Nodes of the smallest and the largest item, valid while
+        # _extremes_version equals _version
+        self._min_node = None
+        self._max_node = None
+        self._extremes_version = -1
+        # Fraction of tombstones that triggers a compaction, None while
+        # items are deleted eagerly
+        self._lazy_threshold = None
+        self._tombstones = 0
+        # Results derived from the tree, each valid while its version
+        # stamp is current: the sorted items and their keys, stamped
+        # with _version, and the height, stamped with _shape_version.
+        # _range_version stamps the last range_find that walked the tree.
+        self._view_version = -1
+        self._view_items = self._view_keys = None
+        self._range_version = -1
+        self._height_version = -1
+        self._height = None
+        if type(source_collection) is type(self) \
+                and source_collection._key_func is key:
+            # Same kind of tree: duplicate its shape instead of re-adding
+            self._root = LinkedBST._clone_nodes(source_collection._root)
+            self._size = len(source_collection)
+            self._tombstones = source_collection._tombstones
+            self._lazy_threshold = source_collection._lazy_threshold
+        else:
+            AbstractCollection.__init__(self, source_collection)
 
     # Accessor methods
     def __str__(self):
         """Returns a string representation with the tree rotated
         90 degrees counterclockwise."""
+        return self.render()
 
-        def recurse(node, level):
-            repres = ""
-            if node is not None:
-                repres += recurse(node.right, level + 1)
-                repres += "| " * level
-                repres += str(node.data) + "\n"
-                repres += recurse(node.left, level + 1)
-            return repres
-
-        return recurse(self._root, 0)
+    def render(self, out=None, *, max_nodes=None, max_depth=None):
+        """
+        Writes the tree rotated 90 degrees counterclockwise to the
+        file-like object out line by line, in time linear in the output.
+        Subtrees deeper than max_depth are shown as "...", and
+        the output stops with "..." after max_nodes nodes.
+        If out is None, returns the representation as a string.
+        :param out:
+        :param max_nodes:
+        :param max_depth:
+        :return:
+        """
+        if out is None:
+            out = io.StringIO()
+            self.render(out, max_nodes=max_nodes, max_depth=max_depth)
+            return out.getvalue()
+
+        # Iterative reverse inorder traversal: right, node, left
+        stack = []
+        written = 0
+        current_node = self._root
+        level = 0
+        while stack or current_node is not None:
+            if current_node is not None:
+                if max_depth is not None and level > max_depth:
+                    out.write("| " * level + "...\n")
+                    current_node = None
+                    continue
+                stack.append((current_node, level))
+                current_node = current_node.right
+                level += 1
+            else:
+                current_node, level = stack.pop()
+                if written == max_nodes:
+                    out.write("...\n")
+                    return
+                out.write("| " * level + str(current_node.data)
+                          + (" (deleted)" if current_node.dead else "")
+                          + "\n")
+                written += 1
+                current_node = current_node.left
+                level += 1
 
     def __iter__(self):
         """Supports a preorder traversal on a view of self."""
@@ -47,7 +131,8 @@ class LinkedBST(AbstractCollection):
             stack.push(self._root)
             while not stack.isEmpty():
                 node = stack.pop()
-                yield node.data
+                if not node.dead:
+                    yield node.data
                 if node.right != None:
                     stack.push(node.right)
                 if node.left != None:
@@ -58,17 +143,23 @@ class LinkedBST(AbstractCollection):
         return None
 
     def inorder(self):
-        """Supports an inorder traversal on a view of self."""
-        lyst = list()
-
-        def recurse(node):
-            if node != None:
-                recurse(node.left)
-                lyst.append(node.data)
-                recurse(node.right)
-
-        recurse(self._root)
-        return iter(lyst)
+        """Supports an inorder traversal on a view of self.
+        The sorted items are cached until the next mutation."""
+        return iter(self._sorted_view())
+
+    def _sorted_view(self):
+        """Return the cached list of the items in inorder, rebuilding
+        it and the list of their keys if the tree has changed"""
+        if self._view_version != self._version:
+            nodes = [node for node in LinkedBST._flatten(self._root)
+                     if not node.dead]
+            self._view_items = [node.data for node in nodes]
+            if self._key_func is None:
+                self._view_keys = self._view_items
+            else:
+                self._view_keys = [node.key for node in nodes]
+            self._view_version = self._version
+        return self._view_items
 
     def postorder(self):
         """Supports a postorder traversal on a view of self."""
@@ -78,6 +169,22 @@ class LinkedBST(AbstractCollection):
         """Supports a levelorder traversal on a view of self."""
         return None
 
+    def cursor(self, seek=None):
+        """
+        Returns a bidirectional cursor placed before the smallest item,
+        or before the smallest item greater or equal to seek.
+        Stepping costs amortized O(1), seeking O(height).
+        :param seek:
+        :return: Cursor
+        """
+        return Cursor(self, seek)
+
+    def _keyof(self, item):
+        """Return the sort key of item"""
+        if self._key_func is None:
+            return item
+        return self._key_func(item)
+
     def __contains__(self, item):
         """Returns True if target is found or False otherwise."""
         return self.find(item) != None
@@ -85,6 +192,27 @@ class LinkedBST(AbstractCollection):
     def find(self, item):
         """If item matches an item in self, returns the
         matched item, or None otherwise.
+        Definite misses are answered by the Bloom filter and results
+        are memoized if the lookup cache is enabled."""
+        if self._auto_step:
+            self.step()
+        key = self._keyof(item)
+        if self._bloom is not None and key not in self._bloom:
+            self._bloom.avoided += 1
+            return None
+        if self._cache is None:
+            result = self._find(key)
+        else:
+            result = self._cache.get(key, _NOT_CACHED)
+            if result is _NOT_CACHED:
+                result = self._find(key)
+                self._cache.put(key, result)
+        if result is None and self._bloom is not None:
+            self._bloom.false_positives += 1
+        return result
+
+    def _find(self, key):
+        """Searches the tree for the item with key.
         Inspired to while loop by
         https://www.geeksforgeeks.org/"""
 
@@ -92,12 +220,17 @@ class LinkedBST(AbstractCollection):
         while True:
             if current_node is None:
                 return None
-            elif current_node.data == item:
-                return item
-            elif item > current_node.data:
-                current_node = current_node.right
-            elif item < current_node.data:
+            elif key < current_node.key:
                 current_node = current_node.left
+            elif current_node.key < key:
+                current_node = current_node.right
+            else:
+                if current_node.dead:
+                    current_node = LinkedBST._equal_node(
+                        current_node, key, False)
+                    if current_node is None:
+                        return None
+                return current_node.data
 
         # # deprecated solution: recursion limit, longer
         # def recurse(node):
@@ -115,31 +248,50 @@ class LinkedBST(AbstractCollection):
     # Mutator methods
     def clear(self):
         """Makes self become empty."""
+        self._before_write([(CLEAR, None)])
         self._root = None
         self._size = 0
+        self._tombstones = 0
+        self._rebuild = None
+        self._auto_step = False
+        if self._cache is not None:
+            self._cache.clear()
+        if self._bloom is not None:
+            self._bloom.clear()
+        self._after_write()
 
     def add(self, item):
         """Adds item to the tree."""
+        key = self._keyof(item)
+        self._before_write([(ADD, item)])
+        if not self._tombstones or not self._revive(item, key):
+            self._add(item, key)
+        self._after_write(added=[(item, key)])
+
+    def _add(self, item, key):
+        """Links a new node for item with key into the tree."""
 
         # Helper function to search for item's position
         def recurse(node):
+            node.size += 1
+            node.live += 1
             # New item is less, go left until spot is found
-            if item < node.data:
+            if key < node.key:
                 if node.left == None:
-                    node.left = BSTNode(item)
+                    node.left = BSTNode(item, key=key)
                 else:
                     recurse(node.left)
             # New item is greater or equal,
             # go right until spot is found
             elif node.right == None:
-                node.right = BSTNode(item)
+                node.right = BSTNode(item, key=key)
             else:
                 recurse(node.right)
                 # End of recurse
 
         # Tree is empty, so new item goes at the root
-        if self.isEmpty():
-            self._root = BSTNode(item)
+        if self._root is None:
+            self._root = BSTNode(item, key=key)
         # Otherwise, search for the item's spot
         else:
             recurse(self._root)
@@ -149,7 +301,179 @@ class LinkedBST(AbstractCollection):
         """Precondition: item is in self.
         Raises: KeyError if item is not in self.
         postcondition: item is removed from self."""
-        if not item in self:
+        key = self._keyof(item)
+        self._before_write([(REMOVE, item)])
+        if (self._lazy_threshold is not None or self._tombstones) \
+                and self._rebuild is None:
+            item_removed = self._bury(key)
+        else:
+            item_removed = self._remove(key)
+        self._after_write(removed=[(item_removed, key)])
+        if self._lazy_threshold is not None and self._tombstones \
+                > self._lazy_threshold * (self._size + self._tombstones):
+            self.compact()
+        return item_removed
+
+    def pop_min(self, count=None):
+        """
+        Removes and returns the smallest item, or a sorted list of the
+        count smallest items if count is given. Runs in O(height + count).
+        Raises: KeyError if count is None and self is empty.
+        :param count:
+        :return:
+        """
+        return self._pop_extreme(count, False)
+
+    def pop_max(self, count=None):
+        """
+        Removes and returns the largest item, or a list of the count
+        largest items, largest first, if count is given.
+        Runs in O(height + count).
+        Raises: KeyError if count is None and self is empty.
+        :param count:
+        :return:
+        """
+        return self._pop_extreme(count, True)
+
+    def _pop_extreme(self, count, largest):
+        """Pop the count smallest or largest items, or one item if
+        count is None"""
+        if count is None:
+            if self.isEmpty():
+                raise KeyError("The tree is empty.")
+            number = 1
+        elif count < 0:
+            raise ValueError("count must not be negative.")
+        else:
+            number = min(count, len(self))
+        if number == 0:
+            return []
+
+        self._before_write([(POP, (number, largest))])
+        nodes = self._cut_extreme(number, largest)
+        if largest:
+            nodes.reverse()
+        self._after_write(removed=[(node.data, node.key) for node in nodes])
+        if count is None:
+            return nodes[0].data
+        return [node.data for node in nodes]
+
+    def _cut_extreme(self, count, largest):
+        """Unlink the nodes of the count smallest or largest items and
+        return the live ones in inorder. Works like split, cutting by
+        rank instead of key. Tombstones among them are dropped."""
+        # near is the side of the cut nodes
+        near, far = ("right", "left") if largest else ("left", "right")
+        cut_top = cut_hook = BSTNode(None)
+        rest_top = rest_hook = BSTNode(None)
+        rest_path = []
+        current_node = self._root
+        while current_node is not None:
+            near_live = LinkedBST._live_of(getattr(current_node, near))
+            if near_live < count:
+                # The node and its near subtree are cut
+                count -= near_live + (not current_node.dead)
+                setattr(cut_hook, far, current_node)
+                cut_hook = current_node
+                current_node = getattr(current_node, far)
+            else:
+                setattr(rest_hook, near, current_node)
+                rest_hook = current_node
+                rest_path.append(current_node)
+                current_node = getattr(current_node, near)
+        setattr(cut_hook, far, None)
+        setattr(rest_hook, near, None)
+        for node in reversed(rest_path):
+            LinkedBST._update_size(node)
+
+        self._root = getattr(rest_top, near)
+        nodes = LinkedBST._flatten(getattr(cut_top, far))
+        if self._tombstones:
+            dead_count = len(nodes)
+            nodes = [node for node in nodes if not node.dead]
+            self._tombstones -= dead_count - len(nodes)
+        self._size -= len(nodes)
+        return nodes
+
+    def _bury(self, key):
+        """Mark the node of a live item with key as a tombstone and
+        return the item.
+        Raises: KeyError if there is no such item."""
+        path = LinkedBST._equal_path(self._root, key, False)
+        if path is None:
+            raise KeyError("Item not in tree.")
+        for node in path:
+            node.live -= 1
+        path[-1].dead = True
+        self._size -= 1
+        self._tombstones += 1
+        return path[-1].data
+
+    def _revive(self, item, key):
+        """Put item into a tombstone with key, if there is one on the
+        search path. Returns True if it did."""
+        path = LinkedBST._equal_path(self._root, key, True)
+        if path is None:
+            return False
+        for node in path:
+            node.live += 1
+        del path[-1].dead
+        path[-1].data = item
+        self._size += 1
+        self._tombstones -= 1
+        return True
+
+    @staticmethod
+    def _equal_node(vertex, key, dead):
+        """Return a node under vertex with key which is a tombstone if
+        dead is True and live otherwise, or None"""
+        path = LinkedBST._equal_path(vertex, key, dead)
+        return None if path is None else path[-1]
+
+    @staticmethod
+    def _equal_path(vertex, key, dead):
+        """Return the path from vertex to a node with key which is a
+        tombstone if dead is True and live otherwise, or None. Equal
+        keys can sit on both sides of each other, so all of them are
+        searched, skipping subtrees without a node of the wanted kind."""
+        path = []
+        node = vertex
+        while node is not None:
+            path.append(node)
+            if key < node.key:
+                node = node.left
+            elif node.key < key:
+                node = node.right
+            elif node.dead == dead:
+                return path
+            else:
+                break
+        if node is None:
+            return None
+        # Nodes to visit below the first node with key, with their depth
+        depth = len(path)
+        stack = [(node.right, depth), (node.left, depth)]
+        while stack:
+            node, depth = stack.pop()
+            if node is None or node.live == (node.size if dead else 0):
+                continue
+            del path[depth:]
+            path.append(node)
+            if key < node.key:
+                stack.append((node.left, depth + 1))
+            elif node.key < key:
+                stack.append((node.right, depth + 1))
+            elif node.dead == dead:
+                return path
+            else:
+                stack.append((node.right, depth + 1))
+                stack.append((node.left, depth + 1))
+        return None
+
+    def _remove(self, key):
+        """Unlinks the node holding the item with key from the tree.
+        Only runs on trees without tombstones."""
+        if self._find(key) is None:
             raise KeyError("Item not in tree.""")
 
         # Helper function to adjust placement of an item
@@ -162,9 +486,12 @@ class LinkedBST(AbstractCollection):
             parent = top
             current_node = top.left
             while not current_node.right == None:
+                current_node.size -= 1
+                current_node.live -= 1
                 parent = current_node
                 current_node = current_node.right
             top.data = current_node.data
+            top.key = current_node.key
             if parent == top:
                 top.left = current_node.left
             else:
@@ -180,17 +507,19 @@ class LinkedBST(AbstractCollection):
         parent = pre_root
         direction = 'L'
         current_node = self._root
+        path = []
         while not current_node == None:
-            if current_node.data == item:
+            if key < current_node.key:
+                next_node = current_node.left
+            elif current_node.key < key:
+                next_node = current_node.right
+            else:
                 item_removed = current_node.data
                 break
+            path.append(current_node)
             parent = current_node
-            if current_node.data > item:
-                direction = 'L'
-                current_node = current_node.left
-            else:
-                direction = 'R'
-                current_node = current_node.right
+            direction = 'L' if next_node is current_node.left else 'R'
+            current_node = next_node
 
         # Return None if the item is absent
         if item_removed == None: return None
@@ -204,6 +533,8 @@ class LinkedBST(AbstractCollection):
         if not current_node.left == None \
                 and not current_node.right == None:
             lift_max_in_left_subtree_to_top(current_node)
+            current_node.size -= 1
+            current_node.live -= 1
         else:
 
             # Case 2: The node has no left child
@@ -222,7 +553,11 @@ class LinkedBST(AbstractCollection):
 
         # All cases: Reset the root (if it hasn't changed no harm done)
         #            Decrement the collection's size counter
+        #            and the subtree sizes along the path
         #            Return the item
+        for node in path:
+            node.size -= 1
+            node.live -= 1
         self._size -= 1
         if self.isEmpty():
             self._root = None
@@ -232,25 +567,36 @@ class LinkedBST(AbstractCollection):
 
     def replace(self, item, new_item):
         """
+        Precondition: item and new_item have equal keys.
         If item is in self, replaces it with new_item and
         returns the old item, or returns None otherwise."""
+        key = self._keyof(item)
+        new_key = self._keyof(new_item)
         probe = self._root
         while probe != None:
-            if probe.data == item:
+            if key < probe.key:
+                probe = probe.left
+            elif probe.key < key:
+                probe = probe.right
+            elif probe.dead:
+                probe = LinkedBST._equal_node(probe, key, False)
+            else:
+                self._before_write([(REPLACE, (item, new_item))])
                 old_data = probe.data
                 probe.data = new_item
+                probe.key = new_key
+                self._after_write(
+                    replaced=[(old_data, key, new_item, new_key)])
                 return old_data
-            elif probe.data > item:
-                probe = probe.left
-            else:
-                probe = probe.right
         return None
 
     def height(self):
         '''
-        Return the height of tree
+        Return the height of tree, cached until its shape changes
         :return: int
         '''
+        if self._height_version == self._shape_version:
+            return self._height
 
         def height1(top):
             '''
@@ -266,7 +612,9 @@ class LinkedBST(AbstractCollection):
             return 1 + max(height1(child)
                            for child in filter(None, [top.left, top.right]))
 
-        return height1(self._root)
+        self._height = height1(self._root)
+        self._height_version = self._shape_version
+        return self._height
 
     def is_balanced(self):
         '''
@@ -278,31 +626,224 @@ class LinkedBST(AbstractCollection):
 
     def range_find(self, low, high):
         '''
-        Returns a list of the items in the tree, where low <= item <= high."""
+        Returns a sorted list of the items in the tree, where low <= item <= high."""
+        A repeated call without a mutation in between caches the sorted
+        items, and later calls bisect them until the next mutation.
         :param low:
         :param high:
         :return:
         '''
         lyst = []
+        low = self._keyof(low)
+        high = self._keyof(high)
+        if self._view_version != self._version \
+                and self._range_version == self._version:
+            # Reads are repeating between writes, the view will pay off
+            self._sorted_view()
+        if self._view_version == self._version:
+            start = bisect_left(self._view_keys, low)
+            stop = bisect_right(self._view_keys, high, start)
+            return self._view_items[start:stop]
+        self._range_version = self._version
 
         def compare(top):
-            if low <= top.data <= high:
+            # Equal keys can sit on both sides, so only a key outside
+            # the range rules a side out
+            if top.left is not None and not top.key < low:
+                compare(top.left)
+            if not top.key < low and not high < top.key and not top.dead:
                 lyst.append(top.data)
-            if LinkedBST.is_leaf(top):
-                return
-
-            if low < top.data < high:
-                for child in LinkedBST.children(top):
-                    compare(child)
-            elif top.data <= low and top.right is not None:
+            if top.right is not None and not high < top.key:
                 compare(top.right)
-            elif top.data >= high and top.left is not None:
-                compare(top.left)
 
         if self._root is not None:
             compare(self._root)
         return lyst
 
+    def enable_cache(self, capacity=1024):
+        """
+        Puts a bounded LRU cache of at most capacity lookups in front
+        of find and __contains__. Negative results are cached too.
+        Entries are invalidated by every mutation of the tree.
+        Keys must be hashable while the cache is enabled.
+        :param capacity:
+        :return:
+        """
+        self._cache = LRUCache(capacity)
+
+    def disable_cache(self):
+        """Drops the lookup cache."""
+        self._cache = None
+
+    def cache_stats(self):
+        """
+        Returns a dictionary with the cache hits, misses, size and
+        capacity, or None if the cache is disabled.
+        :return: dict
+        """
+        if self._cache is None:
+            return None
+        return self._cache.stats()
+
+    def rank(self, item):
+        """
+        Returns the number of items less than item. Runs in O(height).
+        :param item:
+        :return: int
+        """
+        return self._rank_key(self._keyof(item))
+
+    def _rank_key(self, key):
+        """Return the number of items whose key is less than key"""
+        rank = 0
+        current_node = self._root
+        while current_node is not None:
+            if current_node.key < key:
+                rank += LinkedBST._live_of(current_node.left) \
+                    + (not current_node.dead)
+                current_node = current_node.right
+            else:
+                current_node = current_node.left
+        return rank
+
+    def min(self):
+        """
+        Returns the smallest item in O(1) between writes.
+        Raises: KeyError if self is empty.
+        :return:
+        """
+        if self._extremes_version != self._version:
+            self._refresh_extremes()
+        if self._min_node is None:
+            raise KeyError("The tree is empty.")
+        return self._min_node.data
+
+    def max(self):
+        """
+        Returns the largest item in O(1) between writes.
+        Raises: KeyError if self is empty.
+        :return:
+        """
+        if self._extremes_version != self._version:
+            self._refresh_extremes()
+        if self._max_node is None:
+            raise KeyError("The tree is empty.")
+        return self._max_node.data
+
+    def prefix_iter(self, prefix, limit=None):
+        """
+        Generates the items whose string keys start with prefix in
+        ascending order, at most limit of them. Items are streamed with
+        a cursor, so taking k items costs O(height + k).
+        :param prefix:
+        :param limit:
+        :return:
+        """
+        cursor = self.cursor()
+        cursor.seek_key(prefix)
+        count = 0
+        while count != limit:
+            try:
+                node = cursor._next_node()
+            except StopIteration:
+                return
+            if not node.key.startswith(prefix):
+                return
+            yield node.data
+            count += 1
+
+    def prefix_count(self, prefix):
+        """
+        Returns the number of items whose string keys start with
+        prefix. Runs in O(height) using the subtree sizes.
+        :param prefix:
+        :return: int
+        """
+        end = LinkedBST._prefix_end(prefix)
+        if end is None:
+            return len(self) - self._rank_key(prefix)
+        return self._rank_key(end) - self._rank_key(prefix)
+
+    @staticmethod
+    def _prefix_end(prefix):
+        """Return the smallest string greater than every string starting
+        with prefix, or None if there is no such string"""
+        prefix = prefix.rstrip(chr(sys.maxunicode))
+        if not prefix:
+            return None
+        return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+    def enable_bloom_filter(self, error_rate=0.01, capacity=None):
+        """
+        Attaches a counting Bloom filter which answers lookups of absent
+        items in O(1) with a false positive rate of about error_rate.
+        The filter is sized for capacity items, by default the current
+        size, and is rebuilt twice as large when the tree outgrows it.
+        Trees made by split, join and copying start without a filter.
+        Keys must be hashable while the filter is enabled.
+        :param error_rate:
+        :param capacity:
+        :return:
+        """
+        if capacity is None:
+            capacity = max(len(self), 1024)
+        self._bloom = CountingBloomFilter(capacity, error_rate)
+        for node in LinkedBST._flatten(self._root):
+            if not node.dead:
+                self._bloom.add(node.key)
+
+    def disable_bloom_filter(self):
+        """Drops the Bloom filter."""
+        self._bloom = None
+
+    def bloom_stats(self):
+        """
+        Returns a dictionary with the lookups avoided by the Bloom
+        filter, its false positives, capacity and target error rate,
+        or None if the filter is disabled.
+        :return: dict
+        """
+        if self._bloom is None:
+            return None
+        return self._bloom.stats()
+
+    def _rebuild_bloom(self):
+        """Replace the Bloom filter by one sized for twice the current
+        size, keeping its counters of lookups"""
+        old = self._bloom
+        self.enable_bloom_filter(old.error_rate,
+                                 max(2 * len(self), old.capacity))
+        self._bloom.avoided = old.avoided
+        self._bloom.false_positives = old.false_positives
+
+    def enable_lazy_delete(self, threshold=0.5):
+        """
+        Makes remove only mark the item's node as deleted, a tombstone,
+        in O(height) without relinking anything. find, iteration,
+        range_find and len skip tombstones, and adding an equal item
+        revives its tombstone in place. Every node counts the live
+        nodes below it, so ranks, extremes, cursors and pops skip
+        tombstones without compacting. The tree is compacted by a
+        linear rebuild once tombstones make up more than threshold of
+        its nodes.
+        :param threshold:
+        :return:
+        """
+        if not 0 < threshold < 1:
+            raise ValueError("threshold must be in (0, 1).")
+        self._lazy_threshold = threshold
+
+    def disable_lazy_delete(self):
+        """Compacts the tree and goes back to eager deletion."""
+        self.compact()
+        self._lazy_threshold = None
+
+    def compact(self):
+        """Unlinks the tombstones left by lazy deletion, rebalancing
+        the tree. Does nothing if there are none."""
+        if self._tombstones:
+            self.rebalance()
+
     @staticmethod
     def is_leaf(vertex):
         """Check if vertex is leaf"""
@@ -315,26 +856,614 @@ class LinkedBST(AbstractCollection):
 
     def rebalance(self):
         '''
-        Rebalances the tree.
+        Rebalances the tree by relinking its nodes in O(n).
+        Cancels an incremental rebalancing in progress.
         :return:
         '''
-        tree = [vertex for vertex in self.inorder()]
+        nodes = LinkedBST._flatten(self._root)
+        if self._tombstones:
+            nodes = [node for node in nodes if not node.dead]
+            self._tombstones = 0
+        # Relinking keeps every item in its node, so only cursors and
+        # the height are affected
+        self._root = LinkedBST._build_balanced(nodes, 0, len(nodes))
+        self._shape_version += 1
+        self._rebuild = None
+        self._auto_step = False
+
+    def open_journal(self, path, group_size=64):
+        """
+        Makes self durable with a write-ahead journal at path.
+        self is first cleared and loaded from the snapshot and the
+        journal at path, if they exist; from then on every write is
+        journaled before it is made, syncing to disk once per
+        group_size records. split and join refuse journaled trees,
+        whose items would move to trees recovery knows nothing about.
+        :param path:
+        :param group_size:
+        :return:
+        """
+        journal = Journal(path, group_size)
+        self.close_journal()
+        self.clear()
+        journal.replay(self)
+        journal.open()
+        self._journal = journal
+
+    def sync_journal(self):
+        """Forces the journaled mutations to disk."""
+        if self._journal is not None:
+            self._journal.commit()
+
+    def compact_journal(self):
+        """Folds the journal into a sorted snapshot of self, so that
+        recovery only replays mutations made after this call."""
+        if self._journal is not None:
+            self._journal.compact(
+                [node.data for node in LinkedBST._flatten(self._root)
+                 if not node.dead])
+
+    def close_journal(self):
+        """Syncs and detaches the journal."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def split(self, item):
+        """
+        Cuts self at item into two trees and returns them as a tuple
+        (left, right): left holds the items less than item and right
+        holds the items greater or equal to item.
+        The nodes of self are reused without copying, so self becomes
+        empty. Runs in O(height).
+        Raises: RuntimeError if self is journaled.
+        :param item:
+        :return: tuple
+        """
+        if self._journal is not None:
+            raise RuntimeError("Close the journal before splitting.")
+        # Nodes smaller than item are hooked to the right of left_hook,
+        # the rest to the left of right_hook
+        left_top = left_hook = BSTNode(None)
+        right_top = right_hook = BSTNode(None)
+        left_path, right_path = [], []
+        key = self._keyof(item)
+        current_node = self._root
+        while current_node is not None:
+            if current_node.key < key:
+                left_hook.right = current_node
+                left_hook = current_node
+                left_path.append(current_node)
+                current_node = current_node.right
+            else:
+                right_hook.left = current_node
+                right_hook = current_node
+                right_path.append(current_node)
+                current_node = current_node.left
+        left_hook.right = None
+        right_hook.left = None
 
-        # print(tree[:5])
+        # Only the nodes on the search path changed their subtrees
+        for node in reversed(left_path):
+            LinkedBST._update_size(node)
+        for node in reversed(right_path):
+            LinkedBST._update_size(node)
 
-        def rebuild(subtree):
-            if len(subtree) < 3:
-                for vertex in subtree:
-                    self.add(vertex)
-                return
+        left = self._spawn(left_top.right)
+        right = self._spawn(right_top.left)
+        self.clear()
+        return left, right
+
+    @staticmethod
+    def join(left, right):
+        """
+        Concatenates two trees whose key ranges don't overlap (every item
+        of left is less or equal to every item of right) and returns the
+        joined tree.
+        The nodes of both trees are reused without copying, so left and
+        right become empty. Runs in O(height).
+        Raises: ValueError if the key ranges overlap.
+        Raises: RuntimeError if either tree is journaled.
+        :param left:
+        :param right:
+        :return: LinkedBST
+        """
+        if left._journal is not None or right._journal is not None:
+            raise RuntimeError("Close the journals before joining.")
+        if left._root is None or right._root is None:
+            result = left._spawn(left._root or right._root)
+            left.clear()
+            right.clear()
+            return result
+
+        highest = left._root
+        while highest.right is not None:
+            highest = highest.right
+        lowest = right._root
+        while lowest.left is not None:
+            lowest = lowest.left
+        if lowest.key < highest.key:
+            raise ValueError("Key ranges of the trees overlap.")
+
+        # Detach the maximum of left, it becomes the joining node
+        parent = None
+        pivot = left._root
+        pivot_live = int(not highest.dead)
+        while pivot is not highest:
+            pivot.size -= 1
+            pivot.live -= pivot_live
+            parent = pivot
+            pivot = pivot.right
+        if parent is None:
+            left_root = pivot.left
+        else:
+            parent.right = pivot.left
+            left_root = left._root
+        left_size = LinkedBST._size_of(left_root)
+        right_size = right._root.size
+        left_live = LinkedBST._live_of(left_root)
+        right_live = right._root.live
+
+        # Hang the pivot on the spine of the bigger tree at the first
+        # subtree that is not bigger than the other tree, so that the
+        # pivot gets children of comparable weight
+        parent = None
+        if left_size >= right_size:
+            root = current_node = left_root
+            while LinkedBST._size_of(current_node) > right_size:
+                current_node.size += right_size + 1
+                current_node.live += right_live + pivot_live
+                parent = current_node
+                current_node = current_node.right
+            pivot.left, pivot.right = current_node, right._root
+            if parent is None:
+                root = pivot
+            else:
+                parent.right = pivot
+        else:
+            root = current_node = right._root
+            while LinkedBST._size_of(current_node) > left_size:
+                current_node.size += left_size + 1
+                current_node.live += left_live + pivot_live
+                parent = current_node
+                current_node = current_node.left
+            pivot.left, pivot.right = left_root, current_node
+            if parent is None:
+                root = pivot
+            else:
+                parent.left = pivot
+        LinkedBST._update_size(pivot)
 
-            pivot = len(subtree) // 2
-            self.add(subtree[pivot])
-            rebuild(subtree[:pivot])
-            rebuild(subtree[pivot + 1:])
+        result = left._spawn(root)
+        left.clear()
+        right.clear()
+        return result
 
-        self.clear()
-        rebuild(tree)
+    def copy(self):
+        """
+        Returns a shallow copy of self with the same shape, built
+        iteratively in O(n) without comparing any items.
+        :return: LinkedBST
+        """
+        return self._spawn(LinkedBST._clone_nodes(self._root))
+
+    def __copy__(self):
+        """Supports copy.copy, see copy()."""
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        """Supports copy.deepcopy: duplicates the shape like copy() and
+        deep copies every item."""
+        tree = self._spawn(LinkedBST._clone_nodes(
+            self._root, lambda data: deepcopy(data, memo)))
+        memo[id(self)] = tree
+        return tree
+
+    def __getstate__(self):
+        """Supports pickling. The nodes are replaced by the flat list of
+        items in inorder and a shape byte per node in preorder, so deep
+        trees don't hit the recursion limit. The lookup cache and the
+        Bloom filter are only described by their settings and rebuilt
+        empty or from the items on unpickling."""
+        state = self.__dict__.copy()
+        shape = bytearray()
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            shape.append((node.left is not None)
+                         | (node.right is not None) << 1
+                         | node.dead << 2)
+            if node.right is not None:
+                stack.append(node.right)
+            if node.left is not None:
+                stack.append(node.left)
+        state["_root"] = None
+        state["_rebuild"] = None
+        state["_auto_step"] = False
+        state["_journal"] = None
+        state["_min_node"] = state["_max_node"] = None
+        state["_extremes_version"] = -1
+        state["_view_items"] = state["_view_keys"] = None
+        state["_view_version"] = state["_range_version"] = -1
+        state["_height_version"] = -1
+        state["_cache"] = state["_bloom"] = None
+        state["_cache_capacity"] = None if self._cache is None \
+            else self._cache.capacity
+        state["_bloom_settings"] = None if self._bloom is None \
+            else (self._bloom.error_rate, self._bloom.capacity)
+        state["_items"] = [node.data
+                           for node in LinkedBST._flatten(self._root)]
+        state["_shape"] = bytes(shape)
+        return state
+
+    def __setstate__(self, state):
+        """Supports unpickling, rebuilds the nodes in O(n)."""
+        state = dict(state)
+        items = state.pop("_items")
+        shape = state.pop("_shape")
+        cache_capacity = state.pop("_cache_capacity")
+        bloom_settings = state.pop("_bloom_settings")
+        self.__dict__.update(state)
+        self._root = LinkedBST._unflatten(items, shape)
+        for node in LinkedBST._flatten(self._root):
+            node.key = self._keyof(node.data)
+        if cache_capacity is not None:
+            self.enable_cache(cache_capacity)
+        if bloom_settings is not None:
+            # Hashes of strings differ between processes
+            self.enable_bloom_filter(*bloom_settings)
+
+    def export_shared(self, name=None):
+        """
+        Copies self into a shared memory segment that other processes
+        attach to with SharedBST(name) and search without unpickling.
+        Returns the owning replica, whose unlink() frees the segment.
+        :param name:
+        :return: SharedBST
+        """
+        return SharedBST.export(self, name)
+
+    @staticmethod
+    def _clone_nodes(vertex, copy_data=None):
+        """Return a copy of the subtree of vertex with the same shape,
+        passing every item through copy_data if it's given"""
+        if vertex is None:
+            return None
+        if copy_data is None:
+            copy_data = lambda data: data
+
+        def clone(source):
+            target = BSTNode(copy_data(source.data),
+                             key=copy_data(source.key))
+            target.size = source.size
+            target.live = source.live
+            if source.dead:
+                target.dead = True
+            return target
+
+        top = clone(vertex)
+        stack = [(vertex, top)]
+        while stack:
+            source, target = stack.pop()
+            if source.left is not None:
+                target.left = clone(source.left)
+                stack.append((source.left, target.left))
+            if source.right is not None:
+                target.right = clone(source.right)
+                stack.append((source.right, target.right))
+        return top
+
+    @staticmethod
+    def _unflatten(items, shape):
+        """Return the top of a subtree holding items in inorder and
+        shaped by the preorder shape bytes: bit 0 marks a left child,
+        bit 1 a right child and bit 2 a tombstone"""
+        if not items:
+            return None
+        top = BSTNode(None)
+        preorder = []
+        stack = [top]
+        for flags in shape:
+            node = stack.pop()
+            preorder.append(node)
+            if flags & 4:
+                node.dead = True
+            if flags & 2:
+                node.right = BSTNode(None)
+                stack.append(node.right)
+            if flags & 1:
+                node.left = BSTNode(None)
+                stack.append(node.left)
+        # Children follow their parents in preorder
+        for node in reversed(preorder):
+            LinkedBST._update_size(node)
+        for node, item in zip(LinkedBST._flatten(top), items):
+            node.data = item
+        return top
+
+    def _spawn(self, root):
+        """Returns a new tree of the same kind as self which takes
+        ownership of the nodes under root."""
+        tree = type(self)(key=self._key_func)
+        tree._root = root
+        tree._size = LinkedBST._live_of(root)
+        tree._tombstones = LinkedBST._size_of(root) - tree._size
+        if self._cache is not None:
+            tree.enable_cache(self._cache.capacity)
+        tree._lazy_threshold = self._lazy_threshold
+        return tree
+
+    @staticmethod
+    def _flatten(vertex):
+        """Return the list of nodes in the subtree of vertex in inorder"""
+        nodes = []
+        stack = []
+        while stack or vertex is not None:
+            if vertex is not None:
+                stack.append(vertex)
+                vertex = vertex.left
+            else:
+                vertex = stack.pop()
+                nodes.append(vertex)
+                vertex = vertex.right
+        return nodes
+
+    @staticmethod
+    def _build_balanced(nodes, low, high):
+        """Relink nodes[low:high], which are in inorder, into a perfectly
+        balanced subtree and return its top"""
+        if low >= high:
+            return None
+        mid = (low + high) // 2
+        vertex = nodes[mid]
+        vertex.left = LinkedBST._build_balanced(nodes, low, mid)
+        vertex.right = LinkedBST._build_balanced(nodes, mid + 1, high)
+        LinkedBST._update_size(vertex)
+        return vertex
+
+    def _before_write(self, records):
+        """Journal the (kind, args) records of a write that is about to
+        be made. A record that can't be pickled raises before anything
+        is written or changed."""
+        if self._journal is not None:
+            self._journal.write(records)
+
+    def _after_write(self, added=(), removed=(), replaced=()):
+        """Bookkeeping shared by every mutator once the nodes have
+        changed. Invalidates the cached lookups, bumps the versions,
+        keeps the extremes up to date, updates the Bloom filter and
+        reports the write to an incremental rebalancing.
+        added and removed hold the (item, key)
+        pairs that came and went, replaced the (item, key, new_item,
+        new_key) tuples of items replaced in their nodes."""
+        extremes_valid = self._extremes_version == self._version
+        self._version += 1
+        if not replaced:
+            self._shape_version += 1
+        if self._cache is not None:
+            for _, key in removed:
+                self._cache.invalidate(key)
+            for _, key in added:
+                self._cache.invalidate(key)
+            for _, key, _, new_key in replaced:
+                self._cache.invalidate(key)
+                self._cache.invalidate(new_key)
+        if extremes_valid:
+            if replaced:
+                # Every node kept its place
+                self._extremes_version = self._version
+            elif removed:
+                # Removal may move data between nodes, look them up again
+                self._refresh_extremes()
+            elif added:
+                # Equal keys go right, so an equal maximum is superseded
+                if self._min_node is None or any(
+                        key < self._min_node.key for _, key in added):
+                    self._min_node = LinkedBST._leftmost(self._root)
+                if self._max_node is None or any(
+                        not key < self._max_node.key for _, key in added):
+                    self._max_node = LinkedBST._rightmost(self._root)
+                self._extremes_version = self._version
+            # Otherwise the tree was cleared or reloaded, min() looks
+            # the extremes up
+        if self._bloom is not None:
+            for _, key in removed:
+                self._bloom.remove(key)
+            for _, key in added:
+                self._bloom.add(key)
+            for _, key, _, new_key in replaced:
+                self._bloom.remove(key)
+                self._bloom.add(new_key)
+            if len(self) > self._bloom.capacity:
+                self._rebuild_bloom()
+        if self._rebuild is not None:
+            for item, key in removed:
+                self._rebuild.record_remove(item, key)
+            for item, key in added:
+                self._rebuild.record_add(item, key)
+            for item, key, new_item, _ in replaced:
+                self._rebuild.record_replace(item, new_item, key)
+            if self._auto_step:
+                self.step()
+
+    def _refresh_extremes(self):
+        """Look up the nodes of the smallest and the largest item"""
+        self._min_node = LinkedBST._leftmost(self._root)
+        self._max_node = LinkedBST._rightmost(self._root)
+        self._extremes_version = self._version
+
+    @staticmethod
+    def _leftmost(vertex):
+        """Return the leftmost live node under vertex, None if there
+        is none"""
+        if LinkedBST._live_of(vertex) == 0:
+            return None
+        while True:
+            if LinkedBST._live_of(vertex.left):
+                vertex = vertex.left
+            elif vertex.dead:
+                vertex = vertex.right
+            else:
+                return vertex
+
+    @staticmethod
+    def _rightmost(vertex):
+        """Return the rightmost live node under vertex, None if there
+        is none"""
+        if LinkedBST._live_of(vertex) == 0:
+            return None
+        while True:
+            if LinkedBST._live_of(vertex.right):
+                vertex = vertex.right
+            elif vertex.dead:
+                vertex = vertex.left
+            else:
+                return vertex
+
+    @staticmethod
+    def _size_of(vertex):
+        """Return the number of nodes in the subtree of vertex"""
+        return 0 if vertex is None else vertex.size
+
+    @staticmethod
+    def _live_of(vertex):
+        """Return the number of live nodes in the subtree of vertex"""
+        return 0 if vertex is None else vertex.live
+
+    @staticmethod
+    def _update_size(vertex):
+        """Recompute the subtree size and live count of vertex from
+        its children"""
+        vertex.size = 1 + LinkedBST._size_of(vertex.left) \
+            + LinkedBST._size_of(vertex.right)
+        vertex.live = (not vertex.dead) + LinkedBST._live_of(vertex.left) \
+            + LinkedBST._live_of(vertex.right)
+
+    def add_many(self, items):
+        """
+        Adds every item of items to the tree and returns the strategy
+        used for it, "merge" or "finger".
+        The batch is sorted first. If it is large compared to the tree,
+        it is merged with the inorder sequence of the tree, which is then
+        rebuilt balanced in O(n + m). Otherwise the items are inserted in
+        ascending order, every descent resuming from the path of the
+        previous one.
+        :param items:
+        :return: str
+        """
+        items = list(items)
+        keys = [self._keyof(item) for item in items]
+        order = sorted(range(len(items)), key=keys.__getitem__)
+        batch = [items[idx] for idx in order]
+        keys = [keys[idx] for idx in order]
+        self._before_write([(ADD_MANY, batch)])
+        if len(batch) * max(1, log(len(self) + 1, 2)) >= len(self):
+            strategy = "merge"
+            self._merge_sorted(batch, keys)
+        else:
+            strategy = "finger"
+            self._add_sorted(batch, keys)
+        self._after_write(added=list(zip(batch, keys)))
+        return strategy
+
+    def _merge_sorted(self, batch, keys):
+        """Merge the sorted batch, whose keys are keys, with the nodes
+        of the tree and rebuild the tree balanced, without tombstones"""
+        old_nodes = LinkedBST._flatten(self._root)
+        if self._tombstones:
+            old_nodes = [node for node in old_nodes if not node.dead]
+            self._tombstones = 0
+        nodes = []
+        idx = 0
+        for item, key in zip(batch, keys):
+            while idx < len(old_nodes) and not key < old_nodes[idx].key:
+                nodes.append(old_nodes[idx])
+                idx += 1
+            nodes.append(BSTNode(item, key=key))
+        nodes.extend(old_nodes[idx:])
+        self._root = LinkedBST._build_balanced(nodes, 0, len(nodes))
+        self._size = len(nodes)
+
+    def _add_sorted(self, batch, keys):
+        """Insert the sorted batch, whose keys are keys, one by one,
+        keeping a finger on the path to the previous insertion"""
+        # Path entries are [node, upper bound of its subtree or None,
+        # number of insertions done before the node joined the path].
+        # Subtree sizes of path nodes are settled when they leave it.
+        path = []
+        inserted = 0
+        for item, key in zip(batch, keys):
+            while path and path[-1][1] is not None \
+                    and not key < path[-1][1]:
+                node, _, start = path.pop()
+                node.size += inserted - start
+                node.live += inserted - start
+            new_node = BSTNode(item, key=key)
+            if not path:
+                if self._root is None:
+                    self._root = new_node
+                    inserted += 1
+                    path.append([new_node, None, inserted])
+                    continue
+                path.append([self._root, None, inserted])
+
+            node, upper, _ = path[-1]
+            while True:
+                if key < node.key:
+                    upper = node.key
+                    if node.left is None:
+                        node.left = new_node
+                        break
+                    node = node.left
+                else:
+                    if node.right is None:
+                        node.right = new_node
+                        break
+                    node = node.right
+                path.append([node, upper, inserted])
+            inserted += 1
+            path.append([new_node, upper, inserted])
+        for node, _, start in path:
+            node.size += inserted - start
+            node.live += inserted - start
+        self._size += inserted
+
+    def start_rebalance(self, step_time=0.001, auto_step=True):
+        """
+        Starts rebalancing the tree incrementally. A balanced copy is
+        built in steps of about step_time seconds while self keeps
+        serving reads, and is swapped in when it's ready. Writes made
+        meanwhile are captured and applied to the copy.
+        With auto_step, every find, add and remove does one step;
+        otherwise the caller drives the work with step().
+        clear() and replace_ordered_list() cancel the rebalancing.
+        :param step_time:
+        :param auto_step:
+        :return:
+        """
+        self.compact()
+        self._rebuild = IncrementalRebalance(self, step_time)
+        self._auto_step = auto_step
+
+    def step(self, budget=None):
+        """
+        Works on the incremental rebalancing for about budget seconds,
+        the step_time given to start_rebalance by default.
+        Returns True if no rebalancing is left in progress.
+        :param budget:
+        :return: bool
+        """
+        if self._rebuild is None:
+            return True
+        if not self._rebuild.step(budget):
+            return False
+        self._rebuild = None
+        self._auto_step = False
+        return True
+
+    def is_rebalancing(self):
+        """Returns True if an incremental rebalancing is in progress."""
+        return self._rebuild is not None
 
     def successor(self, item):
         """
@@ -345,27 +1474,24 @@ class LinkedBST(AbstractCollection):
         :return:
         :rtype:
         """
-
-        # Helper function to search for item's position
-        def recurse(node):
-            # New item is less, go left until spot is found
-            if item < node.data:
-                # print("!")
-                return node.data
-            # New item is greater or equal,
-            # go right until spot is found
-            elif node.right is None:
-                return None
+        key = self._keyof(item)
+        # Nodes larger than item on the search path, deepest last
+        larger = []
+        current_node = self._root
+        while current_node is not None:
+            if key < current_node.key:
+                larger.append(current_node)
+                current_node = current_node.left
             else:
-                return recurse(node.right)
-                # End of recurse
-
-        # Tree is empty, so return None
-        if self.isEmpty():
-            return None
-        # Otherwise, search for the item's spot
-        else:
-            return recurse(self._root)
+                current_node = current_node.right
+        # A tombstone gives way to the live nodes right after it
+        for node in reversed(larger):
+            if not node.dead:
+                return node.data
+            found = LinkedBST._leftmost(node.right)
+            if found is not None:
+                return found.data
+        return None
 
     def predecessor(self, item):
         """
@@ -376,22 +1502,122 @@ class LinkedBST(AbstractCollection):
         :return:
         :rtype:
         """
-
-        def recurse(previous, current):
-            if current.data >= item:
-                if not previous:
-                    return None
-                else:
-                    return previous.data
-            elif current.right is None:
-                return current.data
+        key = self._keyof(item)
+        # Nodes smaller than item on the search path, deepest last
+        smaller = []
+        current_node = self._root
+        while current_node is not None:
+            if current_node.key < key:
+                smaller.append(current_node)
+                current_node = current_node.right
             else:
-                return recurse(current, current.right)
+                current_node = current_node.left
+        # A tombstone gives way to the live nodes right before it
+        for node in reversed(smaller):
+            if not node.dead:
+                return node.data
+            found = LinkedBST._rightmost(node.left)
+            if found is not None:
+                return found.data
+        return None
 
-        if self.isEmpty():
-            return None
+    def nearest(self, item, k=1, max_distance=None):
+        """
+        Returns a list of up to k items whose numeric keys are closest
+        to the key of item, closest first and the smaller one first on
+        ties. Items further than max_distance are left out if it's
+        given. Runs in O(height + k).
+        :param item:
+        :param k:
+        :param max_distance:
+        :return: list
+        """
+        return self._nearest_at(Cursor(self, item), self._keyof(item),
+                                k, max_distance)
 
-        return recurse(None, self._root)
+    def nearest_many(self, items, k=1, max_distance=None):
+        """
+        Returns the nearest(item, k, max_distance) list of every item
+        of items. Sorted items falling between the same two neighbours
+        share one search from the root.
+        :param items:
+        :param k:
+        :param max_distance:
+        :return: list
+        """
+        results = []
+        anchor = Cursor(self)
+        previous_key = None
+        for item in items:
+            key = self._keyof(item)
+            node = anchor._peek_node()
+            # Reuse the position unless key moved past the next item
+            # or back before the previous query
+            if previous_key is None or key < previous_key \
+                    or (node is not None and node.key < key):
+                anchor.seek_key(key)
+            previous_key = key
+            results.append(self._nearest_at(anchor, key, k, max_distance))
+        return results
+
+    def _nearest_at(self, anchor, key, k, max_distance):
+        """Merge the items before and after the anchor cursor, placed
+        before the first item not less than key, by distance to key.
+        Steps like Cursor.prev and Cursor.next on copies of its path."""
+        anchor._check_version()
+        lower, upper = list(anchor._path), list(anchor._path)
+        above = upper[-1] if upper else None
+        below = None
+        result = []
+        while len(result) < k:
+            while below is None and lower is not None:
+                # Step lower back over one node, tombstones included
+                if not lower:
+                    node = self._root
+                elif lower[-1].left is not None:
+                    node = lower[-1].left
+                else:
+                    idx = len(lower) - 1
+                    while idx > 0 and lower[idx - 1].right is not lower[idx]:
+                        idx -= 1
+                    del lower[idx:]
+                    node = None
+                while node is not None:
+                    lower.append(node)
+                    node = node.right
+                if not lower:
+                    lower = None
+                elif not lower[-1].dead:
+                    below = lower[-1]
+            if above is None and below is None:
+                break
+            if above is None or (below is not None
+                                 and key - below.key <= above.key - key):
+                node, distance = below, key - below.key
+                below = None
+            else:
+                node, distance = above, above.key - key
+                # Step upper forward over one node and any tombstones
+                while True:
+                    if above.right is not None:
+                        above = above.right
+                        while above is not None:
+                            upper.append(above)
+                            above = above.left
+                    else:
+                        idx = len(upper) - 1
+                        while idx > 0 \
+                                and upper[idx - 1].left is not upper[idx]:
+                            idx -= 1
+                        del upper[idx:]
+                    above = upper[-1] if upper else None
+                    if above is None or not above.dead:
+                        break
+            if max_distance is not None and distance > max_distance:
+                # Every remaining item is even further
+                break
+            result.append(node.data)
+        return result
 
     def demo_bst(self, path):
         """
@@ -473,12 +1699,27 @@ class LinkedBST(AbstractCollection):
 
     def replace_ordered_list(self, llist):
         """Replace elements in BST with already ordered list"""
-        self._size = 0
-        self._root = BSTNode(llist[0])
+        if not llist:
+            self.clear()
+            return
+        keys = [self._keyof(item) for item in llist]
+        self._before_write([(CLEAR, None), (ADD_MANY, list(llist))])
+        if self._cache is not None:
+            self._cache.clear()
+        self._rebuild = None
+        self._auto_step = False
+        self._size = len(llist)
+        self._tombstones = 0
+        self._root = BSTNode(llist[0], key=keys[0])
+        self._root.size = self._root.live = len(llist)
         current_node = self._root
         for idx in range(1, len(llist)):
-            current_node.right = BSTNode(llist[idx])
+            current_node.right = BSTNode(llist[idx], key=keys[idx])
             current_node = current_node.right
+            current_node.size = current_node.live = len(llist) - idx
+        if self._bloom is not None:
+            self._rebuild_bloom()
+        self._after_write()
 
     @staticmethod
     def read_dict(path):
@@ -0,0 +1,63 @@
+"""
+File: lrucache.py
+Bounded least recently used cache
+"""
+
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """A bounded mapping which evicts the least recently used entry
+    once it is full and counts lookup hits and misses."""
+
+    def __init__(self, capacity):
+        """Creates an empty cache holding at most capacity entries."""
+        if capacity < 1:
+            raise ValueError("Cache capacity must be positive.")
+        self._capacity = capacity
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def capacity(self):
+        """Maximal number of entries"""
+        return self._capacity
+
+    def __len__(self):
+        """Returns the number of entries in self."""
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """Returns the value cached for key and marks it as recently used,
+        or returns default if key is not cached."""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Caches value for key, evicting the least recently used
+        entry if the cache is full."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._capacity:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """Drops the entry for key if there is one."""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Drops all entries."""
+        self._entries.clear()
+
+    def stats(self):
+        """Returns a dictionary with the hit and miss counters,
+        the number of entries and the capacity."""
+        return {"hits": self.hits, "misses": self.misses,
+                "size": len(self._entries), "capacity": self._capacity}
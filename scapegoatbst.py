@@ -0,0 +1,151 @@
+"""
+File: scapegoatbst.py
+Scapegoat binary search tree
+"""
+
+from math import floor, log
+from bstnode import BSTNode
+from linkedbst import LinkedBST
+
+
+class ScapegoatBST(LinkedBST):
+    """A linked binary search tree that keeps itself balanced by
+    rebuilding the scapegoat subtree whenever an insertion goes deeper
+    than the alpha-height bound. Amortized insertion stays O(log n)
+    without any rotations or per-node colors."""
+
+    def __init__(self, source_collection=None, alpha=0.7, key=None):
+        """Sets the initial state of self, which includes the
+        contents of sourceCollection, if it's present.
+        alpha must be in [0.5, 1): a subtree is rebuilt when one of its
+        children holds more than alpha of its nodes.
+        key, if given, maps an item to the value it is ordered by."""
+        if not 0.5 <= alpha < 1:
+            raise ValueError("alpha must be in [0.5, 1).")
+        self._alpha = alpha
+        self._max_size = 0
+        self._rebuilds = 0
+        LinkedBST.__init__(self, source_collection, key)
+        self._max_size = max(self._max_size, self._size)
+
+    @property
+    def alpha(self):
+        """Weight balance parameter of the tree"""
+        return self._alpha
+
+    @property
+    def rebuilds(self):
+        """Number of subtree rebuilds done so far"""
+        return self._rebuilds
+
+    def _height_bound(self):
+        """Return the deepest depth allowed for the current number of
+        nodes, tombstones included"""
+        return floor(log(self._size + self._tombstones, 1 / self._alpha))
+
+    # Mutator methods
+    def clear(self):
+        """Makes self become empty."""
+        LinkedBST.clear(self)
+        self._max_size = 0
+
+    def _add(self, item, key):
+        """Links a new node for item into the tree, rebuilding the
+        scapegoat subtree if the new node is too deep."""
+        new_node = BSTNode(item, key=key)
+        self._size += 1
+        self._max_size = max(self._max_size, self._size)
+        if self._root is None:
+            self._root = new_node
+            return
+
+        # Descend to the item's spot, remembering the path
+        path = []
+        current_node = self._root
+        while current_node is not None:
+            current_node.size += 1
+            current_node.live += 1
+            path.append(current_node)
+            if key < current_node.key:
+                current_node = current_node.left
+            else:
+                current_node = current_node.right
+        if key < path[-1].key:
+            path[-1].left = new_node
+        else:
+            path[-1].right = new_node
+
+        if len(path) > self._height_bound():
+            self._rebuild_scapegoat(path, new_node)
+
+    def _remove(self, key):
+        """Unlinks the node holding key from the tree.
+        Rebuilds the whole tree once it has shrunk below alpha
+        of its largest size since the last full rebuild."""
+        item_removed = LinkedBST._remove(self, key)
+        self._rebuild_if_shrunk()
+        return item_removed
+
+    def _cut_extreme(self, count, largest):
+        """Unlinks the count smallest or largest nodes, rebuilding the
+        tree like _remove if it has shrunk too much."""
+        nodes = LinkedBST._cut_extreme(self, count, largest)
+        self._rebuild_if_shrunk()
+        return nodes
+
+    def add_many(self, items):
+        """Adds every item of items to the tree and returns the strategy
+        used for it, "merge" or "finger"."""
+        strategy = LinkedBST.add_many(self, items)
+        self._max_size = max(self._max_size, self._size)
+        return strategy
+
+    def rebalance(self):
+        """Rebalances the tree."""
+        LinkedBST.rebalance(self)
+        self._max_size = self._size
+
+    def _add_sorted(self, batch, keys):
+        """Insert the sorted batch one by one, keeping the depth bound"""
+        for item, key in zip(batch, keys):
+            self._add(item, key)
+
+    def _rebuild_if_shrunk(self):
+        """Rebuild the whole tree if it holds less than alpha of its
+        largest size since the last full rebuild, dropping tombstones"""
+        if self._size < self._alpha * self._max_size:
+            nodes = [node for node in LinkedBST._flatten(self._root)
+                     if not node.dead]
+            self._root = LinkedBST._build_balanced(nodes, 0, len(nodes))
+            self._tombstones = 0
+            self._max_size = self._size
+            self._rebuilds += 1
+
+    def _rebuild_scapegoat(self, path, child):
+        """Find the lowest ancestor on path whose child is heavier than
+        alpha of it and rebuild the ancestor's subtree"""
+        for idx in range(len(path) - 1, -1, -1):
+            ancestor = path[idx]
+            if child.size > self._alpha * ancestor.size:
+                break
+            child = ancestor
+        else:
+            return
+
+        top = LinkedBST._build_balanced(
+            LinkedBST._flatten(ancestor), 0, ancestor.size)
+        if idx == 0:
+            self._root = top
+        elif path[idx - 1].left is ancestor:
+            path[idx - 1].left = top
+        else:
+            path[idx - 1].right = top
+        self._rebuilds += 1
+
+    def _spawn(self, root):
+        """Returns a new tree of the same kind as self which takes
+        ownership of the nodes under root."""
+        tree = LinkedBST._spawn(self, root)
+        tree._alpha = self._alpha
+        tree._max_size = tree._size
+        return tree
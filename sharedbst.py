@@ -0,0 +1,344 @@
+"""
+File: sharedbst.py
+Read-only replica of a linked binary search tree in shared memory
+"""
+
+import pickle
+import struct
+import threading
+from array import array
+from multiprocessing import shared_memory, resource_tracker
+
+# Segment header: magic, flags, number of items, root index
+_HEADER = struct.Struct("=8sB7xqq")
+_MAGIC = b"LBSTSHM1"
+# Flags: keys are pickled instead of UTF-8 strings, items are stored
+# apart from their keys
+_PICKLED_KEYS = 1
+_HAS_ITEMS = 2
+# Child index of a missing child
+_NONE = -1
+# Serializes the patching of the resource tracker in _attach
+_ATTACH_LOCK = threading.Lock()
+
+
+class SharedBST(object):
+    """An immutable binary search tree laid out flat in a
+    multiprocessing.shared_memory segment, which any number of processes
+    can attach to and search without copying or unpickling it.
+
+    The nodes are stored in sorted order, so a node's index is its rank.
+    Each node is an offset into a blob of encoded keys plus the indices
+    of its two children; strings are kept as UTF-8, other keys pickled.
+    Only the keys met on the way down are read: UTF-8 bytes sort like
+    the strings they encode, so string keys are compared as bytes
+    without decoding. The shape is balanced on export whatever the
+    shape of the source tree."""
+
+    def __init__(self, name, key=None):
+        """Attaches to the replica exported under name. key must be the
+        key function of the exported tree, if it had one.
+        Raises: ValueError if the tree had a key function and key
+        is None."""
+        self._owner = False
+        self._views = None
+        self._shm = SharedBST._attach(name)
+        self._key_func = key
+        self._map()
+
+    @staticmethod
+    def export(tree, name=None):
+        """Copies the linked tree into a new shared memory segment,
+        called name or given a random name, and returns the replica
+        owning it. The owner must call unlink() to free the segment."""
+        nodes = [node for node in tree._flatten(tree._root)
+                 if not node.dead]
+        count = len(nodes)
+        keys = [node.key for node in nodes]
+        flags = 0
+        if all(type(key) is str for key in keys):
+            key_blobs = [key.encode("utf-8") for key in keys]
+        else:
+            key_blobs = [pickle.dumps(key) for key in keys]
+            flags |= _PICKLED_KEYS
+        item_blobs = []
+        if tree._key_func is not None:
+            item_blobs = [pickle.dumps(node.data) for node in nodes]
+            flags |= _HAS_ITEMS
+
+        # Balanced shape: the node of range [low, high) is its middle
+        left = array("q", [_NONE]) * count
+        right = array("q", [_NONE]) * count
+        root = count // 2 if count else _NONE
+        ranges = [(0, count)]
+        while ranges:
+            low, high = ranges.pop()
+            mid = (low + high) // 2
+            if low < mid:
+                left[mid] = (low + mid) // 2
+                ranges.append((low, mid))
+            if mid + 1 < high:
+                right[mid] = (mid + 1 + high) // 2
+                ranges.append((mid + 1, high))
+
+        sections = [SharedBST._offsets(key_blobs)]
+        if flags & _HAS_ITEMS:
+            sections.append(SharedBST._offsets(item_blobs))
+        sections += [left, right]
+        header = _HEADER.pack(_MAGIC, flags, count, root)
+        parts = [header] + [section.tobytes() for section in sections] \
+            + key_blobs + item_blobs
+        size = sum(len(part) for part in parts)
+
+        shm = shared_memory.SharedMemory(name, create=True, size=max(size, 1))
+        position = 0
+        for part in parts:
+            shm.buf[position:position + len(part)] = part
+            position += len(part)
+        replica = SharedBST.__new__(SharedBST)
+        replica._owner = True
+        replica._unlinked = False
+        replica._shm = shm
+        replica._key_func = tree._key_func
+        replica._map()
+        return replica
+
+    @property
+    def name(self):
+        """Name of the shared memory segment"""
+        return self._shm.name
+
+    # Accessor methods
+    def __len__(self):
+        """Returns the number of items in self."""
+        return self._count
+
+    def __iter__(self):
+        """Supports an inorder traversal on a view of self."""
+        for idx in range(self._count):
+            yield self._item(idx)
+
+    def __contains__(self, item):
+        """Returns True if target is found or False otherwise."""
+        return self.find(item) is not None
+
+    def find(self, item):
+        """If item matches an item in self, returns the
+        matched item, or None otherwise."""
+        key = self._probe(item)
+        if key is None:
+            return None
+        decode, blob = self._decode_key, self._key_blob
+        offsets = self._key_offsets
+        left, right = self._left, self._right
+        idx = self._root
+        while idx != _NONE:
+            current_key = decode(blob[offsets[idx]:offsets[idx + 1]])
+            if key < current_key:
+                idx = left[idx]
+            elif current_key < key:
+                idx = right[idx]
+            else:
+                return self._item(idx)
+        return None
+
+    def rank(self, item):
+        """Returns the number of items less than item."""
+        return self._lower_bound(self._ordered_probe(item))
+
+    def successor(self, item):
+        """Returns the smallest item that is larger than
+        item, or None if there is no such item."""
+        idx = self._upper_bound(self._ordered_probe(item))
+        if idx == self._count:
+            return None
+        return self._item(idx)
+
+    def predecessor(self, item):
+        """Returns the largest item that is smaller than
+        item, or None if there is no such item."""
+        idx = self._lower_bound(self._ordered_probe(item))
+        if idx == 0:
+            return None
+        return self._item(idx - 1)
+
+    def range_find(self, low, high):
+        """Returns a sorted list of the items in self,
+        where low <= item <= high."""
+        start = self._lower_bound(self._ordered_probe(low))
+        stop = self._upper_bound(self._ordered_probe(high))
+        return [self._item(idx) for idx in range(start, stop)]
+
+    # Mutator methods
+    def close(self):
+        """Detaches self from the segment, which other processes
+        can still use."""
+        if self._views is None:
+            return
+        # Views into the segment must go before it can be closed
+        for view in self._views:
+            view.release()
+        self._views = None
+        self._shm.close()
+
+    def unlink(self):
+        """Detaches self and frees the segment. Only the exporting
+        replica may call it, once every process is done. It may be
+        called after close() too."""
+        if not self._owner:
+            raise RuntimeError("Only the exporting replica can unlink.")
+        self.close()
+        if not self._unlinked:
+            self._shm.unlink()
+            self._unlinked = True
+
+    def __del__(self):
+        """Detaches self when it's garbage collected."""
+        if getattr(self, "_views", None) is not None:
+            self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._owner:
+            self.unlink()
+        else:
+            self.close()
+
+    # Helper methods
+    def _probe(self, item):
+        """Return the sort key of item in the form the stored keys are
+        compared in, or None if the stored keys are strings and the
+        key of item is not"""
+        key = item if self._key_func is None else self._key_func(item)
+        if self._flags & _PICKLED_KEYS:
+            return key
+        if not isinstance(key, str):
+            return None
+        return key.encode("utf-8")
+
+    def _ordered_probe(self, item):
+        """Return the probe key of item like _probe, raising TypeError
+        if it can't be ordered among the stored keys"""
+        key = self._probe(item)
+        if key is None and self._count \
+                and not self._flags & _PICKLED_KEYS:
+            raise TypeError("The keys of this replica are strings.")
+        return key
+
+    def _item(self, idx):
+        """Decode the item of the node at idx"""
+        if self._flags & _HAS_ITEMS:
+            return pickle.loads(self._item_blob[
+                self._item_offsets[idx]:self._item_offsets[idx + 1]])
+        key = self._key_blob[self._key_offsets[idx]:self._key_offsets[idx + 1]]
+        if self._flags & _PICKLED_KEYS:
+            return pickle.loads(key)
+        return str(key, "utf-8")
+
+    def _lower_bound(self, key):
+        """Return the index of the first item whose key is not less
+        than the probe key"""
+        decode, blob = self._decode_key, self._key_blob
+        offsets = self._key_offsets
+        left, right = self._left, self._right
+        found = self._count
+        idx = self._root
+        while idx != _NONE:
+            if decode(blob[offsets[idx]:offsets[idx + 1]]) < key:
+                idx = right[idx]
+            else:
+                found = idx
+                idx = left[idx]
+        return found
+
+    def _upper_bound(self, key):
+        """Return the index of the first item whose key is greater
+        than the probe key"""
+        decode, blob = self._decode_key, self._key_blob
+        offsets = self._key_offsets
+        left, right = self._left, self._right
+        found = self._count
+        idx = self._root
+        while idx != _NONE:
+            if key < decode(blob[offsets[idx]:offsets[idx + 1]]):
+                found = idx
+                idx = left[idx]
+            else:
+                idx = right[idx]
+        return found
+
+    def _map(self):
+        """Set up views of the header, the index arrays and the blobs
+        of the attached segment"""
+        buf = self._shm.buf
+        magic, self._flags, count, self._root = _HEADER.unpack_from(buf)
+        if magic != _MAGIC:
+            raise ValueError("Not a shared tree segment.")
+        if self._flags & _HAS_ITEMS and self._key_func is None:
+            # Probes would be compared with keys of another kind
+            raise ValueError("The tree was exported with a key function, "
+                             "which must be passed as key.")
+        self._count = count
+        self._views = []
+
+        def take(length):
+            nonlocal position
+            view = buf[position:position + length]
+            position += length
+            self._views.append(view)
+            return view
+
+        def take_indices(length):
+            view = take(length * 8).cast("q")
+            self._views.append(view)
+            return view
+
+        position = _HEADER.size
+        self._key_offsets = take_indices(count + 1)
+        if self._flags & _HAS_ITEMS:
+            self._item_offsets = take_indices(count + 1)
+        self._left = take_indices(count)
+        self._right = take_indices(count)
+        self._key_blob = take(self._key_offsets[count])
+        if self._flags & _HAS_ITEMS:
+            self._item_blob = take(self._item_offsets[count])
+        # Turns a stored key into the form probes are compared with
+        self._decode_key = pickle.loads \
+            if self._flags & _PICKLED_KEYS else memoryview.tobytes
+        # Release the derived views first
+        self._views.reverse()
+
+    @staticmethod
+    def _offsets(blobs):
+        """Return the array of blob start offsets, ending with the
+        total length"""
+        offsets = array("q", [0])
+        total = 0
+        for blob in blobs:
+            total += len(blob)
+            offsets.append(total)
+        return offsets
+
+    @staticmethod
+    def _attach(name):
+        """Open the existing segment name without handing it to this
+        process's resource tracker, which would free it on exit.
+        Before Python 3.13 the tracker is patched meanwhile, so shared
+        memory created by other threads at the same time, outside of
+        SharedBST, goes untracked."""
+        try:
+            return shared_memory.SharedMemory(name, track=False)
+        except TypeError:
+            pass
+        # Before Python 3.13 every attach is tracked. Unregistering
+        # afterwards is no cure: forked workers share the tracker of
+        # the exporting process and would drop its registration.
+        with _ATTACH_LOCK:
+            register = resource_tracker.register
+            resource_tracker.register = lambda name, rtype: None
+            try:
+                return shared_memory.SharedMemory(name)
+            finally:
+                resource_tracker.register = register
@@ -0,0 +1,160 @@
+"""
+File: splaybst.py
+Splay (self-adjusting) binary search tree
+"""
+
+from bstnode import BSTNode
+from linkedbst import LinkedBST
+
+
+class SplayBST(LinkedBST):
+    """A linked binary search tree which moves accessed nodes to the
+    root. Frequently accessed items stay near the top. Lookups only
+    splay nodes found deeper than about 2 log2(n), so once the hot
+    items are near the top, reads stop restructuring the tree."""
+
+    # Accessor methods
+    def _find(self, key):
+        """Searches the tree for key. The matched node, or the last node
+        visited if there is none, is splayed to the root if it's deeper
+        than the splay depth."""
+        path = self._search_path(key)
+        if not path:
+            return None
+        node = path[-1]
+        if len(path) > self._splay_depth():
+            self._splay(path)
+        if node.key == key:
+            if node.dead:
+                # Look for a live item with an equal key
+                return LinkedBST._find(self, key)
+            return node.data
+        return None
+
+    # Mutator methods
+    def _add(self, item, key):
+        """Links a new node for item into the tree and splays it
+        to the root."""
+        new_node = BSTNode(item, key=key)
+        self._size += 1
+        if self._root is None:
+            self._root = new_node
+            return
+
+        path = []
+        current_node = self._root
+        while current_node is not None:
+            current_node.size += 1
+            current_node.live += 1
+            path.append(current_node)
+            if key < current_node.key:
+                current_node = current_node.left
+            else:
+                current_node = current_node.right
+        if key < path[-1].key:
+            path[-1].left = new_node
+        else:
+            path[-1].right = new_node
+        path.append(new_node)
+        self._splay(path)
+
+    def _remove(self, key):
+        """Splays the node holding key to the root and unlinks it."""
+        path = self._search_path(key)
+        if path:
+            self._splay(path)
+        if self._root is None or self._root.key != key:
+            raise KeyError("Item not in tree.")
+
+        top = self._root
+        if top.left is None:
+            self._root = top.right
+        else:
+            # Splay the maximum of the left subtree to its top, it
+            # has no right child then and takes over the right subtree
+            path = [top.left]
+            while path[-1].right is not None:
+                path.append(path[-1].right)
+            self._root = SplayBST._splay_path(path)
+            self._root.right = top.right
+            LinkedBST._update_size(self._root)
+        self._size -= 1
+        return top.data
+
+    # Helper methods
+    def _splay_depth(self):
+        """Return the depth, about 2 log2(n), below which found nodes
+        are splayed"""
+        return 2 * (self._size + self._tombstones).bit_length()
+
+    def _add_sorted(self, batch, keys):
+        """Insert the sorted batch one by one, splaying each item"""
+        for item, key in zip(batch, keys):
+            self._add(item, key)
+
+    def _search_path(self, key):
+        """Return the list of nodes from the root to the node holding
+        key, or to the last node visited if key is absent"""
+        path = []
+        current_node = self._root
+        while current_node is not None:
+            path.append(current_node)
+            if key < current_node.key:
+                current_node = current_node.left
+            elif current_node.key < key:
+                current_node = current_node.right
+            else:
+                break
+        return path
+
+    def _splay(self, path):
+        """Move the last node of path, which starts at the root,
+        to the root. Open cursors notice the changed shape, results
+        derived from the items stay valid."""
+        if len(path) > 1:
+            self._root = SplayBST._splay_path(path)
+            self._shape_version += 1
+
+    @staticmethod
+    def _splay_path(path):
+        """Rotate the last node of path up to the first node's place
+        and return it. path is consumed."""
+        vertex = path.pop()
+        while path:
+            parent = path.pop()
+            if not path:
+                # Zig: parent is the top
+                SplayBST._rotate(vertex, parent)
+                break
+            grand = path.pop()
+            if (grand.left is parent) == (parent.left is vertex):
+                # Zig-zig
+                SplayBST._rotate(parent, grand)
+                SplayBST._rotate(vertex, parent)
+            else:
+                # Zig-zag
+                if grand.left is parent:
+                    grand.left = SplayBST._rotate(vertex, parent)
+                else:
+                    grand.right = SplayBST._rotate(vertex, parent)
+                SplayBST._rotate(vertex, grand)
+            if path:
+                if path[-1].left is grand:
+                    path[-1].left = vertex
+                else:
+                    path[-1].right = vertex
+        return vertex
+
+    @staticmethod
+    def _rotate(child, parent):
+        """Rotate child above parent and return child. The link to
+        parent from its own parent is left for the caller to fix."""
+        if parent.left is child:
+            parent.left = child.right
+            child.right = parent
+        else:
+            parent.right = child.left
+            child.left = parent
+        LinkedBST._update_size(parent)
+        LinkedBST._update_size(child)
+        return child
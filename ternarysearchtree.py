@@ -0,0 +1,130 @@
+"""
+File: ternarysearchtree.py
+Ternary search tree index for string prefix queries
+"""
+
+from itertools import islice
+from abstractcollection import AbstractCollection
+from tstnode import TSTNode
+
+
+class TernarySearchTree(AbstractCollection):
+    """A compact trie of strings where every node has lo, eq and hi
+    links. Looking up a prefix costs O(len(prefix) * log(alphabet)),
+    independently of the number of words stored."""
+
+    def __init__(self, source_collection=None):
+        """Sets the initial state of self, which includes the
+        contents of sourceCollection, if it's present."""
+        self._root = None
+        # Number of empty strings, which have no node
+        self._empty = 0
+        AbstractCollection.__init__(self, source_collection)
+
+    # Accessor methods
+    def __iter__(self):
+        """Supports an alphabetical traversal on a view of self."""
+        return self.prefix_iter("")
+
+    def __contains__(self, word):
+        """Returns True if word is in self or False otherwise."""
+        if not word:
+            return self._empty > 0
+        node = self._find_node(word)
+        return node is not None and node.ends > 0
+
+    def prefix_count(self, prefix):
+        """Returns the number of words starting with prefix."""
+        if not prefix:
+            return len(self)
+        node = self._find_node(prefix)
+        return 0 if node is None else node.count
+
+    def prefix_iter(self, prefix, limit=None):
+        """Returns an iterator over the words starting with prefix in
+        alphabetical order, yielding at most limit words."""
+        if not prefix:
+            words = self._all_words()
+        else:
+            words = self._words_under(self._find_node(prefix), prefix)
+        return islice(words, limit)
+
+    # Mutator methods
+    def clear(self):
+        """Makes self become empty."""
+        self._root = None
+        self._empty = 0
+        self._size = 0
+
+    def add(self, word):
+        """Adds word to self."""
+        self._size += 1
+        if not word:
+            self._empty += 1
+            return
+        if self._root is None:
+            self._root = TSTNode(word[0])
+        node = self._root
+        idx = 0
+        while True:
+            char = word[idx]
+            if char < node.char:
+                if node.lo is None:
+                    node.lo = TSTNode(char)
+                node = node.lo
+            elif char > node.char:
+                if node.hi is None:
+                    node.hi = TSTNode(char)
+                node = node.hi
+            else:
+                node.count += 1
+                idx += 1
+                if idx == len(word):
+                    node.ends += 1
+                    return
+                if node.eq is None:
+                    node.eq = TSTNode(word[idx])
+                node = node.eq
+
+    # Helper methods
+    def _find_node(self, prefix):
+        """Return the node of the last character of prefix,
+        or None if no word starts with prefix"""
+        node = self._root
+        idx = 0
+        while node is not None:
+            char = prefix[idx]
+            if char < node.char:
+                node = node.lo
+            elif char > node.char:
+                node = node.hi
+            else:
+                idx += 1
+                if idx == len(prefix):
+                    return node
+                node = node.eq
+        return None
+
+    def _all_words(self):
+        """Generate every word in alphabetical order"""
+        for _ in range(self._empty):
+            yield ""
+        yield from self._walk(self._root, "")
+
+    def _words_under(self, node, prefix):
+        """Generate prefix and its continuations below node, which holds
+        the last character of prefix"""
+        if node is None:
+            return
+        for _ in range(node.ends):
+            yield prefix
+        yield from self._walk(node.eq, prefix)
+
+    def _walk(self, node, prefix):
+        """Generate the words of the subtree of node, which all
+        start with prefix, in alphabetical order"""
+        if node is None:
+            return
+        yield from self._walk(node.lo, prefix)
+        yield from self._words_under(node, prefix + node.char)
+        yield from self._walk(node.hi, prefix)
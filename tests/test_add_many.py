@@ -0,0 +1,64 @@
+"""
+File: test_add_many.py
+Tests for batched insertion into the linked trees
+"""
+
+import random
+import unittest
+
+from linkedbst import LinkedBST
+from scapegoatbst import ScapegoatBST
+from splaybst import SplayBST
+from test_trees import check_counts
+
+
+class AddManyTest(unittest.TestCase):
+
+    def test_reports_the_strategy(self):
+        tree = LinkedBST()
+        self.assertEqual(tree.add_many([3, 1, 2]), "merge")
+        tree = LinkedBST()
+        tree.add_many(range(1000))
+        # 10 * log2(1001) is less than the 1000 items of the tree
+        self.assertEqual(tree.add_many(range(2000, 2010)), "finger")
+        self.assertEqual(tree.add_many(range(3000, 3200)), "merge")
+        self.assertEqual(tree.add_many([]), "finger")
+
+    def test_merge_rebuilds_balanced(self):
+        tree = LinkedBST()
+        tree.replace_ordered_list(list(range(0, 200, 2)))
+        self.assertEqual(tree.add_many(range(1, 200, 2)), "merge")
+        self.assertEqual(list(tree.inorder()), list(range(200)))
+        self.assertTrue(tree.is_balanced())
+        check_counts(self, tree)
+
+    def test_batches_match_repeated_adds(self):
+        rng = random.Random(34)
+        for tree_type in (LinkedBST, SplayBST, ScapegoatBST):
+            base = [rng.randint(0, 500) for _ in range(300)]
+            tree = tree_type(base)
+            model = sorted(base)
+            for size in (1, 5, 40, 400):
+                batch = [rng.randint(-50, 550) for _ in range(size)]
+                tree.add_many(batch)
+                model = sorted(model + batch)
+                self.assertEqual(list(tree.inorder()), model)
+                self.assertEqual(len(tree), len(model))
+                self.assertEqual((tree.min(), tree.max()),
+                                 (model[0], model[-1]))
+                check_counts(self, tree)
+
+    def test_merge_drops_tombstones(self):
+        tree = LinkedBST(range(10))
+        tree.enable_lazy_delete(0.9)
+        tree.remove(3)
+        tree.remove(7)
+        self.assertEqual(tree.add_many([3, 11, 12]), "merge")
+        self.assertEqual(tree._tombstones, 0)
+        self.assertEqual(list(tree.inorder()),
+                         [0, 1, 2, 3, 4, 5, 6, 8, 9, 11, 12])
+        check_counts(self, tree)
+
+
+if __name__ == "__main__":
+    unittest.main()
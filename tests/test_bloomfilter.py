@@ -0,0 +1,105 @@
+"""
+File: test_bloomfilter.py
+Tests for the counting Bloom filter and its use in the linked trees
+"""
+
+import unittest
+
+from bloomfilter import CountingBloomFilter
+from linkedbst import LinkedBST
+from splaybst import SplayBST
+
+
+class CountingBloomFilterTest(unittest.TestCase):
+
+    def test_has_no_false_negatives(self):
+        bloom = CountingBloomFilter(200, 0.01)
+        for item in range(200):
+            bloom.add(item)
+        for item in range(200):
+            self.assertIn(item, bloom)
+        false_positives = sum(item in bloom for item in range(1000, 3000))
+        self.assertLess(false_positives, 100)
+
+    def test_remove_forgets_one_occurrence(self):
+        bloom = CountingBloomFilter(10)
+        bloom.add("a")
+        bloom.add("a")
+        bloom.remove("a")
+        self.assertIn("a", bloom)
+        bloom.remove("a")
+        self.assertNotIn("a", bloom)
+        bloom.add("b")
+        bloom.clear()
+        self.assertNotIn("b", bloom)
+
+    def test_rejects_bad_settings(self):
+        with self.assertRaises(ValueError):
+            CountingBloomFilter(0)
+        with self.assertRaises(ValueError):
+            CountingBloomFilter(10, 1.5)
+
+
+class TreeBloomFilterTest(unittest.TestCase):
+
+    def make(self, tree_type=LinkedBST):
+        tree = tree_type(range(0, 20, 2))
+        tree.enable_bloom_filter(error_rate=0.001)
+        return tree
+
+    def test_counts_avoided_lookups(self):
+        tree = self.make()
+        for item in range(1, 20, 2):
+            self.assertNotIn(item, tree)
+        self.assertEqual(tree.find(4), 4)
+        stats = tree.bloom_stats()
+        self.assertEqual(stats["avoided"] + stats["false_positives"], 10)
+        self.assertGreater(stats["avoided"], 0)
+        self.assertEqual((stats["capacity"], stats["error_rate"]),
+                         (1024, 0.001))
+        tree.disable_bloom_filter()
+        self.assertIsNone(tree.bloom_stats())
+
+    def test_writes_update_the_filter(self):
+        for tree_type in (LinkedBST, SplayBST):
+            tree = self.make(tree_type)
+            tree.add(5)
+            self.assertIn(5, tree)
+            tree.add_many([7, 7])
+            self.assertEqual(tree.find(7), 7)
+            tree.remove(7)
+            self.assertIn(7, tree)
+            tree.remove(7)
+            self.assertNotIn(7, tree)
+            self.assertEqual(tree.replace(5, 5.5), 5)
+            self.assertEqual(tree.find(5.5), 5.5)
+            self.assertIsNone(tree.find(5))
+            self.assertEqual(tree.pop_min(), 0)
+            self.assertNotIn(0, tree)
+            tree.clear()
+            self.assertNotIn(2, tree)
+            tree.add(2)
+            self.assertIn(2, tree)
+
+    def test_lazy_deletes_update_the_filter(self):
+        tree = self.make()
+        tree.enable_lazy_delete(0.9)
+        tree.remove(4)
+        self.assertNotIn(4, tree)
+        tree.add(4)
+        self.assertIn(4, tree)
+
+    def test_grows_with_the_tree_keeping_its_counters(self):
+        tree = LinkedBST()
+        tree.enable_bloom_filter(capacity=4)
+        tree.find(1)
+        tree.add_many(range(10))
+        stats = tree.bloom_stats()
+        self.assertGreaterEqual(stats["capacity"], 10)
+        self.assertEqual(stats["avoided"], 1)
+        for item in range(10):
+            self.assertIn(item, tree)
+
+
+if __name__ == "__main__":
+    unittest.main()
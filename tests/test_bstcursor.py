@@ -0,0 +1,76 @@
+"""
+File: test_bstcursor.py
+Tests for the bidirectional cursor over linked trees
+"""
+
+import unittest
+
+from linkedbst import LinkedBST
+from splaybst import SplayBST
+
+
+class CursorTest(unittest.TestCase):
+
+    def test_iterates_in_order(self):
+        tree = LinkedBST([5, 3, 8, 3, 1, 9])
+        self.assertEqual(list(tree.cursor()), [1, 3, 3, 5, 8, 9])
+        self.assertEqual(list(LinkedBST().cursor()), [])
+
+    def test_next_and_prev_walk_both_ways(self):
+        cursor = LinkedBST(range(0, 10, 2)).cursor()
+        with self.assertRaises(StopIteration):
+            cursor.prev()
+        self.assertEqual([cursor.next() for _ in range(3)], [0, 2, 4])
+        self.assertEqual(cursor.prev(), 4)
+        self.assertEqual(cursor.prev(), 2)
+        self.assertEqual(cursor.peek(), 2)
+        self.assertEqual(list(cursor), [2, 4, 6, 8])
+        self.assertIsNone(cursor.peek())
+        with self.assertRaises(StopIteration):
+            cursor.next()
+        self.assertEqual(cursor.prev(), 8)
+
+    def test_seek(self):
+        tree = LinkedBST(range(0, 10, 2))
+        cursor = tree.cursor(seek=3)
+        self.assertEqual(cursor.next(), 4)
+        cursor.seek(4)
+        self.assertEqual(cursor.peek(), 4)
+        self.assertEqual(cursor.prev(), 2)
+        cursor.seek(100)
+        self.assertIsNone(cursor.peek())
+        self.assertEqual(cursor.prev(), 8)
+        cursor.seek(-1)
+        self.assertEqual(cursor.next(), 0)
+        cursor.seek_first()
+        self.assertEqual(cursor.next(), 0)
+
+    def test_seek_lands_on_the_first_duplicate(self):
+        cursor = LinkedBST([5, 5, 3, 5, 7]).cursor(seek=5)
+        self.assertEqual(list(cursor), [5, 5, 5, 7])
+
+    def test_detects_modification(self):
+        tree = LinkedBST(range(5))
+        cursor = tree.cursor()
+        cursor.next()
+        tree.add(10)
+        with self.assertRaises(RuntimeError):
+            cursor.next()
+        with self.assertRaises(RuntimeError):
+            cursor.prev()
+        cursor.seek(1)
+        self.assertEqual(list(cursor), [1, 2, 3, 4, 10])
+
+    def test_range_reads_keep_it_but_relinking_does_not(self):
+        tree = SplayBST(range(20))
+        cursor = tree.cursor()
+        cursor.next()
+        tree.range_find(3, 5)
+        self.assertEqual(cursor.next(), 1)
+        tree.rebalance()
+        with self.assertRaises(RuntimeError):
+            cursor.next()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+File: test_bstjournal.py
+Tests for recovering journaled linked trees
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from linkedbst import LinkedBST
+from test_trees import ITEMS
+
+
+class JournalRecoveryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "tree.journal")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_torn_tail_is_dropped(self):
+        tree = LinkedBST()
+        tree.open_journal(self.path, group_size=1)
+        tree.add_many(ITEMS)
+        tree.remove(8)
+        tree.replace(5, 5)
+        tree.pop_min(2)
+        tree.add(42)
+        tree.close_journal()
+        expected = sorted(ITEMS)[2:]
+        expected.remove(8)
+
+        # A crash halfway through the last record
+        with open(self.path, "r+b") as ffile:
+            ffile.truncate(os.path.getsize(self.path) - 3)
+        recovered = LinkedBST()
+        recovered.open_journal(self.path)
+        self.assertEqual(list(recovered.inorder()), expected)
+
+        # The torn record is cut off before new ones are appended
+        recovered.add(43)
+        recovered.close_journal()
+        again = LinkedBST()
+        again.open_journal(self.path)
+        self.assertEqual(list(again.inorder()), sorted(expected + [43]))
+        again.close_journal()
+
+    def recover(self):
+        """Return a tree recovered from the journal"""
+        tree = LinkedBST()
+        tree.open_journal(self.path)
+        items = list(tree.inorder())
+        tree.close_journal()
+        return items
+
+    def test_replays_every_kind_of_write(self):
+        tree = LinkedBST()
+        tree.open_journal(self.path, group_size=4)
+        tree.add_many(ITEMS)
+        tree.add(4)
+        tree.remove(3)
+        with self.assertRaises(KeyError):
+            tree.remove(6)
+        tree.replace(5, 5.0)
+        self.assertEqual(tree.pop_max(2), [9, 8])
+        tree.pop_min()
+        expected = list(tree.inorder())
+        tree.close_journal()
+        self.assertEqual(self.recover(), expected)
+
+    def test_compaction_keeps_the_items(self):
+        tree = LinkedBST()
+        tree.open_journal(self.path)
+        tree.add_many(ITEMS)
+        tree.compact_journal()
+        tree.remove(9)
+        tree.add(11)
+        tree.clear()
+        tree.add(12)
+        tree.compact_journal()
+        tree.add(13)
+        tree.close_journal()
+        self.assertEqual(self.recover(), [12, 13])
+
+    def test_split_and_join_refuse_journaled_trees(self):
+        tree = LinkedBST([1, 2, 3])
+        tree.open_journal(self.path)
+        tree.add(4)
+        with self.assertRaises(RuntimeError):
+            tree.split(2)
+        with self.assertRaises(RuntimeError):
+            LinkedBST.join(LinkedBST([0]), tree)
+        self.assertEqual(list(tree.inorder()), [4])
+        tree.close_journal()
+
+    def test_replace_by_an_empty_list_clears(self):
+        tree = LinkedBST()
+        tree.open_journal(self.path)
+        tree.add_many([1, 2, 3])
+        tree.replace_ordered_list([])
+        self.assertEqual(list(tree.inorder()), [])
+        self.assertEqual(len(tree), 0)
+        tree.close_journal()
+        recovered = LinkedBST()
+        recovered.open_journal(self.path)
+        self.assertEqual(list(recovered.inorder()), [])
+        recovered.close_journal()
+
+    def test_unpicklable_item_leaves_the_tree_unchanged(self):
+        class Local(int):
+            """Can't be pickled, being local to this function"""
+
+        tree = LinkedBST(key=int)
+        tree.open_journal(self.path)
+        tree.add_many([1, 2, 3])
+        with self.assertRaises(Exception):
+            tree.add(Local(4))
+        self.assertEqual(list(tree.inorder()), [1, 2, 3])
+        tree.close_journal()
+        recovered = LinkedBST(key=int)
+        recovered.open_journal(self.path)
+        self.assertEqual(list(recovered.inorder()), [1, 2, 3])
+        recovered.close_journal()
+
+
+if __name__ == "__main__":
+    unittest.main()
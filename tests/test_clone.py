@@ -0,0 +1,96 @@
+"""
+File: test_clone.py
+Tests for copying and pickling the linked trees
+"""
+
+import copy
+import pickle
+import unittest
+
+from linkedbst import LinkedBST
+from scapegoatbst import ScapegoatBST
+from splaybst import SplayBST
+from test_trees import check_counts
+
+
+def shape(tree):
+    """Return the preorder items and child flags of every node"""
+    result = []
+    stack = [tree._root] if tree._root is not None else []
+    while stack:
+        node = stack.pop()
+        result.append((node.data, node.left is not None,
+                       node.right is not None, node.dead))
+        for child in (node.right, node.left):
+            if child is not None:
+                stack.append(child)
+    return result
+
+
+class CloneTest(unittest.TestCase):
+
+    def make(self, tree_type=LinkedBST):
+        tree = tree_type([[5], [3], [8], [1], [4], [7], [9], [3]], key=min)
+        tree.enable_lazy_delete(0.9)
+        tree.remove([7])
+        return tree
+
+    def check_clone(self, tree, clone):
+        self.assertIs(type(clone), type(tree))
+        self.assertEqual(shape(clone), shape(tree))
+        self.assertEqual(len(clone), len(tree))
+        self.assertEqual(clone._tombstones, tree._tombstones)
+        check_counts(self, clone)
+        # The clone is independent of the tree
+        clone.add([6])
+        self.assertIsNone(tree.find([6]))
+
+    def test_copy_shares_the_items(self):
+        for tree_type in (LinkedBST, SplayBST, ScapegoatBST):
+            tree = self.make(tree_type)
+            clones = (tree.copy(), copy.copy(tree), tree_type(tree, key=min))
+            for clone in clones:
+                self.assertIs(clone.find([5]), tree.find([5]))
+                self.check_clone(tree, clone)
+
+    def test_deepcopy_copies_the_items(self):
+        tree = self.make()
+        clone = copy.deepcopy(tree)
+        self.assertEqual(clone.find([5]), [5])
+        self.assertIsNot(clone.find([5]), tree.find([5]))
+        self.check_clone(tree, clone)
+
+    def test_pickle_round_trip(self):
+        for tree_type in (LinkedBST, SplayBST, ScapegoatBST):
+            tree = self.make(tree_type)
+            clone = pickle.loads(pickle.dumps(tree))
+            self.assertEqual(list(clone.inorder()), list(tree.inorder()))
+            self.check_clone(tree, clone)
+            self.assertEqual(clone.min(), [1])
+
+    def test_pickle_keeps_the_settings_of_cache_and_filter(self):
+        tree = LinkedBST(range(10))
+        tree.enable_cache(capacity=5)
+        tree.enable_bloom_filter(error_rate=0.05, capacity=100)
+        tree.find(3)
+        tree.find(30)
+        clone = pickle.loads(pickle.dumps(tree))
+        self.assertEqual(clone.cache_stats(), {"hits": 0, "misses": 0,
+                                               "size": 0, "capacity": 5})
+        stats = clone.bloom_stats()
+        self.assertEqual((stats["capacity"], stats["error_rate"]), (100, 0.05))
+        self.assertEqual(stats["avoided"], 0)
+        self.assertEqual(clone.find(3), 3)
+        self.assertIsNone(clone.find(30))
+
+    def test_deep_tree_pickles_without_recursion(self):
+        tree = LinkedBST()
+        tree.replace_ordered_list(list(range(20000)))
+        clone = pickle.loads(pickle.dumps(tree))
+        self.assertEqual(len(clone), 20000)
+        self.assertEqual(clone.max(), 19999)
+        self.assertEqual(len(copy.deepcopy(tree)), 20000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+File: test_incrementalrebalance.py
+Tests for incremental rebalancing of the linked trees
+"""
+
+import random
+import unittest
+from bisect import insort
+from unittest import mock
+
+import incrementalrebalance
+from linkedbst import LinkedBST
+from scapegoatbst import ScapegoatBST
+from splaybst import SplayBST
+from test_trees import ITEMS, check_counts
+
+
+class IncrementalRebalanceTest(unittest.TestCase):
+    """A write after every other unit of work, for the first 300 units,
+    reaches every phase: collecting, applying the log, linking the new
+    tree and replaying the writes made meanwhile."""
+
+    def run_with_writes(self, tree_type):
+        rng = random.Random(37)
+        model = sorted(ITEMS * 3)
+        tree = tree_type(model)
+        tree.start_rebalance(step_time=0, auto_step=False)
+        steps = 0
+        with mock.patch.object(incrementalrebalance, "_CLOCK_EVERY", 1):
+            while not tree.step(0):
+                steps += 1
+                if steps % 2 or steps > 300:
+                    continue
+                value = rng.randint(0, 10)
+                choice = rng.random()
+                if choice < 0.35:
+                    tree.add(value)
+                    insort(model, value)
+                elif choice < 0.7:
+                    if value in model:
+                        tree.remove(value)
+                        model.remove(value)
+                elif choice < 0.8:
+                    tree.replace(value, value)
+                elif choice < 0.9:
+                    batch = [rng.randint(0, 10) for _ in range(2)]
+                    tree.add_many(batch)
+                    for item in batch:
+                        insort(model, item)
+                elif model:
+                    self.assertEqual(tree.pop_min(), model.pop(0))
+                self.assertEqual(list(tree.inorder()), model)
+        self.assertGreater(steps, len(ITEMS) * 3)
+        self.assertFalse(tree.is_rebalancing())
+        self.assertEqual(list(tree.inorder()), model)
+        check_counts(self, tree)
+
+    def test_linked(self):
+        self.run_with_writes(LinkedBST)
+
+    def test_splay(self):
+        self.run_with_writes(SplayBST)
+
+    def test_scapegoat(self):
+        self.run_with_writes(ScapegoatBST)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+File: test_key.py
+Tests for ordering the linked trees by a key function
+"""
+
+import unittest
+
+from linkedbst import LinkedBST
+from scapegoatbst import ScapegoatBST
+from splaybst import SplayBST
+
+WORDS = ["pear", "Apple", "fig", "Banana", "cherry", "apple"]
+
+
+class KeyTest(unittest.TestCase):
+
+    def test_orders_and_finds_by_key(self):
+        for tree_type in (LinkedBST, SplayBST, ScapegoatBST):
+            tree = tree_type(WORDS, key=str.lower)
+            self.assertEqual(list(tree.inorder()),
+                             ["Apple", "apple", "Banana", "cherry", "fig",
+                              "pear"])
+            self.assertEqual(tree.find("FIG"), "fig")
+            self.assertIn("BANANA", tree)
+            self.assertNotIn("kiwi", tree)
+            self.assertEqual(tree.range_find("b", "D"), ["Banana", "cherry"])
+            self.assertEqual(tree.successor("APPLE"), "Banana")
+            self.assertEqual(tree.predecessor("Cherry"), "Banana")
+            self.assertEqual(tree.rank("CHERRY"), 3)
+            self.assertEqual(tree.remove("PEAR"), "pear")
+            self.assertEqual(tree.replace("FIG", "Fig"), "fig")
+            self.assertEqual(tree.max(), "Fig")
+
+    def test_computes_each_key_once(self):
+        calls = []
+
+        def key(item):
+            calls.append(item)
+            return -item
+
+        tree = LinkedBST(key=key)
+        tree.add_many(range(100))
+        self.assertEqual(len(calls), 100)
+        tree.add(100)
+        self.assertEqual(len(calls), 101)
+        del calls[:]
+        self.assertEqual(tree.find(50), 50)
+        tree.range_find(60, 40)
+        tree.rebalance()
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(tree.min(), 100)
+
+    def test_split_and_copy_keep_the_key(self):
+        tree = LinkedBST(WORDS, key=str.lower)
+        self.assertEqual(list(tree.copy().inorder()), list(tree.inorder()))
+        left, right = tree.split("C")
+        self.assertEqual(list(left.inorder()), ["Apple", "apple", "Banana"])
+        self.assertEqual(right.find("PEAR"), "pear")
+
+    def test_copy_with_another_key_reorders(self):
+        tree = LinkedBST([3, 1, 2], key=lambda item: -item)
+        self.assertEqual(list(tree.inorder()), [3, 2, 1])
+        self.assertEqual(list(LinkedBST(tree).inorder()), [1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
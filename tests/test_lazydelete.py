@@ -0,0 +1,78 @@
+"""
+File: test_lazydelete.py
+Tests for lazy deletion with tombstones in the linked trees
+"""
+
+import copy
+import unittest
+
+from linkedbst import LinkedBST
+from test_trees import check_counts
+
+
+class LazyDeleteTest(unittest.TestCase):
+
+    def test_revive_reuses_the_tombstone(self):
+        tree = LinkedBST(range(10))
+        tree.enable_lazy_delete(0.9)
+        tree.remove(4)
+        self.assertEqual(tree._tombstones, 1)
+        self.assertEqual(tree._root.size, 10)
+        tree.add(4)
+        self.assertEqual(tree._tombstones, 0)
+        self.assertEqual(tree._root.size, 10)
+        self.assertEqual(list(tree.inorder()), list(range(10)))
+        check_counts(self, tree)
+
+    def test_reads_skip_tombstones_without_compacting(self):
+        tree = LinkedBST(range(10))
+        tree.enable_lazy_delete(0.9)
+        for item in (0, 1, 5, 9):
+            tree.remove(item)
+        self.assertEqual(tree._tombstones, 4)
+        self.assertEqual((tree.min(), tree.max()), (2, 8))
+        self.assertEqual(tree.rank(6), 3)
+        self.assertEqual(tree.successor(4), 6)
+        self.assertEqual(tree.predecessor(6), 4)
+        self.assertEqual(list(tree.cursor()), [2, 3, 4, 6, 7, 8])
+        self.assertEqual(tree.nearest(5, 2), [4, 6])
+        self.assertEqual(tree.pop_min(2), [2, 3])
+        self.assertEqual(tree.pop_max(), 8)
+        self.assertGreater(tree._tombstones, 0)
+        check_counts(self, tree)
+
+    def test_copy_keeps_deleting_lazily(self):
+        tree = LinkedBST([5, 3, 8, 7, 9, 8])
+        tree.enable_lazy_delete(0.9)
+        tree.remove(8)
+        clone = LinkedBST(tree)
+        self.assertEqual(clone.remove(8), 8)
+        self.assertEqual(list(clone.inorder()), [3, 5, 7, 9])
+        self.assertEqual(clone._tombstones, 2)
+        check_counts(self, clone)
+
+    def test_ordered_list_counts_every_node_live(self):
+        tree = LinkedBST()
+        tree.replace_ordered_list(list(range(10)))
+        check_counts(self, tree)
+        self.assertEqual(len(tree.copy()), 10)
+        self.assertEqual(len(copy.deepcopy(tree)), 10)
+        left, right = tree.split(5)
+        self.assertEqual(list(left.inorder()), [0, 1, 2, 3, 4])
+        self.assertEqual(list(right.inorder()), [5, 6, 7, 8, 9])
+        self.assertEqual((len(left), len(right)), (5, 5))
+
+    def test_compacts_at_the_threshold(self):
+        tree = LinkedBST(range(10))
+        tree.enable_lazy_delete(0.5)
+        for item in range(5):
+            tree.remove(item)
+        self.assertEqual(tree._tombstones, 5)
+        tree.remove(5)
+        self.assertEqual(tree._tombstones, 0)
+        self.assertEqual(list(tree.inorder()), [6, 7, 8, 9])
+        check_counts(self, tree)
+
+
+if __name__ == "__main__":
+    unittest.main()
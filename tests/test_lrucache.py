@@ -0,0 +1,88 @@
+"""
+File: test_lrucache.py
+Tests for the LRU cache and the lookup cache of the linked trees
+"""
+
+import unittest
+
+from linkedbst import LinkedBST
+from lrucache import LRUCache
+from splaybst import SplayBST
+
+
+class LRUCacheTest(unittest.TestCase):
+
+    def test_evicts_the_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+        self.assertEqual(cache.stats(), {"hits": 3, "misses": 1,
+                                         "size": 2, "capacity": 2})
+
+    def test_invalidate_and_clear(self):
+        cache = LRUCache(4)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.invalidate("a")
+        cache.invalidate("z")
+        self.assertEqual(cache.get("a", "missing"), "missing")
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_rejects_a_capacity_below_one(self):
+        with self.assertRaises(ValueError):
+            LRUCache(0)
+
+
+class LookupCacheTest(unittest.TestCase):
+
+    def make(self, tree_type=LinkedBST):
+        tree = tree_type([5, 3, 8, 1, 4])
+        tree.enable_cache(capacity=8)
+        return tree
+
+    def test_counts_hits_and_misses(self):
+        tree = self.make()
+        self.assertEqual(tree.find(3), 3)
+        self.assertEqual(tree.find(3), 3)
+        self.assertNotIn(7, tree)
+        self.assertNotIn(7, tree)
+        stats = tree.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 2))
+        self.assertEqual((stats["size"], stats["capacity"]), (2, 8))
+        tree.disable_cache()
+        self.assertIsNone(tree.cache_stats())
+
+    def test_writes_invalidate_cached_results(self):
+        for tree_type in (LinkedBST, SplayBST):
+            tree = self.make(tree_type)
+            self.assertNotIn(7, tree)
+            tree.add(7)
+            self.assertIn(7, tree)
+            tree.remove(7)
+            self.assertNotIn(7, tree)
+            tree.add_many([7, 9])
+            self.assertEqual((tree.find(7), tree.find(9)), (7, 9))
+            self.assertEqual(tree.pop_max(2), [9, 8])
+            self.assertNotIn(9, tree)
+            self.assertEqual(tree.replace(7, 7.0), 7)
+            self.assertIs(type(tree.find(7)), float)
+            tree.clear()
+            self.assertNotIn(3, tree)
+
+    def test_removing_a_duplicate_keeps_the_other(self):
+        tree = self.make()
+        tree.add(3)
+        self.assertEqual(tree.find(3), 3)
+        tree.remove(3)
+        self.assertEqual(tree.find(3), 3)
+        tree.remove(3)
+        self.assertIsNone(tree.find(3))
+
+
+if __name__ == "__main__":
+    unittest.main()
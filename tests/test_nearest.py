@@ -0,0 +1,71 @@
+"""
+File: test_nearest.py
+Tests for the k-nearest queries of the linked trees
+"""
+
+import random
+import unittest
+
+from linkedbst import LinkedBST
+from splaybst import SplayBST
+
+
+def brute_nearest(items, target, k, max_distance=None):
+    """Return the k items closest to target, the smaller one first
+    on ties"""
+    ranked = sorted(items, key=lambda item: (abs(item - target), item))
+    if max_distance is not None:
+        ranked = [item for item in ranked
+                  if abs(item - target) <= max_distance]
+    return ranked[:k]
+
+
+class NearestTest(unittest.TestCase):
+
+    def test_closest_first_smaller_on_ties(self):
+        tree = LinkedBST([1, 4, 6, 10, 11])
+        self.assertEqual(tree.nearest(5), [4])
+        self.assertEqual(tree.nearest(5, 3), [4, 6, 1])
+        self.assertEqual(tree.nearest(10, 2), [10, 11])
+        self.assertEqual(tree.nearest(100, 2), [11, 10])
+        self.assertEqual(tree.nearest(-3, 10), [1, 4, 6, 10, 11])
+        self.assertEqual(LinkedBST().nearest(5, 2), [])
+
+    def test_max_distance(self):
+        tree = LinkedBST([1, 4, 6, 10, 11])
+        self.assertEqual(tree.nearest(5, 5, max_distance=1), [4, 6])
+        self.assertEqual(tree.nearest(8, 5, max_distance=1), [])
+        self.assertEqual(tree.nearest(8, 5, max_distance=2), [6, 10])
+
+    def test_duplicates_and_keys(self):
+        tree = LinkedBST([3, 3, 5], key=lambda item: -item)
+        self.assertEqual(tree.nearest(3, 2), [3, 3])
+        words = LinkedBST(["aa", "b", "cccc"], key=len)
+        self.assertEqual(words.nearest("xxx"), ["aa"])
+
+    def test_nearest_many_matches_nearest(self):
+        rng = random.Random(42)
+        items = [rng.uniform(0, 100) for _ in range(200)]
+        for tree_type in (LinkedBST, SplayBST):
+            tree = tree_type(items)
+            queries = [rng.uniform(-10, 110) for _ in range(50)]
+            for batch in (sorted(queries), queries):
+                results = tree.nearest_many(batch, 3, max_distance=5)
+                self.assertEqual(results,
+                                 [brute_nearest(items, query, 3, 5)
+                                  for query in batch])
+                self.assertEqual(results,
+                                 [tree.nearest(query, 3, 5)
+                                  for query in batch])
+
+    def test_skips_deleted_items(self):
+        tree = LinkedBST(range(10))
+        tree.enable_lazy_delete(0.9)
+        tree.remove(5)
+        tree.remove(4)
+        self.assertEqual(tree.nearest(5, 3), [6, 3, 7])
+        self.assertEqual(tree.nearest_many([4, 5], 1), [[3], [6]])
+
+
+if __name__ == "__main__":
+    unittest.main()
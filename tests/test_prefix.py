@@ -0,0 +1,83 @@
+"""
+File: test_prefix.py
+Tests for prefix search over string keys in the linked trees and the
+ternary search tree
+"""
+
+import sys
+import unittest
+
+from linkedbst import LinkedBST
+from ternarysearchtree import TernarySearchTree
+
+WORDS = ["car", "cart", "carbon", "care", "cat", "cab", "dog", "do",
+         "", "car", "zebra", "ca"]
+
+
+class PrefixTest(object):
+    """Tests both indexes must pass. Subclasses define make()."""
+
+    def make(self, words):
+        """Return a new index holding words"""
+        raise NotImplementedError
+
+    def expected(self, prefix):
+        return sorted(word for word in WORDS if word.startswith(prefix))
+
+    def test_prefix_iter(self):
+        index = self.make(WORDS)
+        for prefix in ("", "c", "ca", "car", "carb", "d", "x", "zebras"):
+            self.assertEqual(list(index.prefix_iter(prefix)),
+                             self.expected(prefix))
+
+    def test_prefix_iter_limit(self):
+        index = self.make(WORDS)
+        self.assertEqual(list(index.prefix_iter("car", limit=3)),
+                         ["car", "car", "carbon"])
+        self.assertEqual(list(index.prefix_iter("car", limit=0)), [])
+        self.assertEqual(list(index.prefix_iter("do", limit=10)),
+                         ["do", "dog"])
+
+    def test_prefix_count(self):
+        index = self.make(WORDS)
+        for prefix in ("", "c", "ca", "car", "carb", "d", "x", "zebras"):
+            self.assertEqual(index.prefix_count(prefix),
+                             len(self.expected(prefix)))
+
+
+class LinkedBSTPrefixTest(PrefixTest, unittest.TestCase):
+
+    def make(self, words):
+        return LinkedBST(words)
+
+    def test_count_of_a_prefix_ending_in_the_largest_character(self):
+        top = chr(sys.maxunicode)
+        tree = LinkedBST(["a" + top, "a" + top + "b", "b"])
+        self.assertEqual(tree.prefix_count("a" + top), 2)
+        self.assertEqual(tree.prefix_count(top), 0)
+
+    def test_skips_deleted_items(self):
+        tree = LinkedBST(WORDS)
+        tree.enable_lazy_delete(0.9)
+        tree.remove("cart")
+        tree.remove("car")
+        self.assertEqual(list(tree.prefix_iter("car")),
+                         ["car", "carbon", "care"])
+        self.assertEqual(tree.prefix_count("car"), 3)
+
+
+class TernarySearchTreePrefixTest(PrefixTest, unittest.TestCase):
+
+    def make(self, words):
+        return TernarySearchTree(words)
+
+    def test_contains_whole_words_only(self):
+        index = self.make(WORDS)
+        self.assertIn("cart", index)
+        self.assertIn("", index)
+        self.assertNotIn("carb", index)
+        self.assertEqual(len(index), len(WORDS))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+File: test_priority.py
+Tests for the priority queue operations of the linked trees
+"""
+
+import random
+import unittest
+
+from linkedbst import LinkedBST
+from scapegoatbst import ScapegoatBST
+from splaybst import SplayBST
+from test_trees import check_counts
+
+
+class PriorityTest(unittest.TestCase):
+
+    def test_min_and_max(self):
+        for tree_type in (LinkedBST, SplayBST, ScapegoatBST):
+            tree = tree_type([5, 3, 8, 3, 9, 1])
+            self.assertEqual((tree.min(), tree.max()), (1, 9))
+            tree.add(0)
+            tree.add(10)
+            self.assertEqual((tree.min(), tree.max()), (0, 10))
+            tree.remove(0)
+            tree.remove(10)
+            self.assertEqual((tree.min(), tree.max()), (1, 9))
+            tree.clear()
+            with self.assertRaises(KeyError):
+                tree.min()
+            with self.assertRaises(KeyError):
+                tree.max()
+
+    def test_max_is_the_last_of_equal_items(self):
+        tree = LinkedBST([(1, "a"), (2, "b")], key=lambda item: item[0])
+        tree.add((2, "c"))
+        self.assertEqual(tree.max(), (2, "c"))
+        self.assertEqual(tree.pop_max(), (2, "c"))
+        self.assertEqual(tree.max(), (2, "b"))
+
+    def test_pop_one(self):
+        tree = LinkedBST([5, 3, 8, 3])
+        self.assertEqual(tree.pop_min(), 3)
+        self.assertEqual(tree.pop_max(), 8)
+        self.assertEqual(list(tree.inorder()), [3, 5])
+        self.assertEqual(len(tree), 2)
+        tree.pop_min()
+        tree.pop_min()
+        with self.assertRaises(KeyError):
+            tree.pop_min()
+        with self.assertRaises(KeyError):
+            tree.pop_max()
+
+    def test_pop_k(self):
+        for tree_type in (LinkedBST, SplayBST, ScapegoatBST):
+            tree = tree_type([5, 3, 8, 3, 9, 1, 7])
+            self.assertEqual(tree.pop_min(3), [1, 3, 3])
+            self.assertEqual(tree.pop_max(2), [9, 8])
+            self.assertEqual(tree.pop_min(0), [])
+            self.assertEqual(tree.pop_max(10), [7, 5])
+            self.assertEqual(tree.pop_min(1), [])
+            self.assertEqual(len(tree), 0)
+            with self.assertRaises(ValueError):
+                tree.pop_max(-1)
+
+    def test_matches_a_heap(self):
+        rng = random.Random(41)
+        tree = LinkedBST()
+        model = []
+        for _ in range(500):
+            choice = rng.random()
+            if choice < 0.5 or not model:
+                items = [rng.randint(0, 100) for _ in range(rng.randint(1, 4))]
+                tree.add_many(items)
+                model = sorted(model + items)
+            elif choice < 0.75:
+                count = rng.randint(1, 5)
+                self.assertEqual(tree.pop_min(count), model[:count])
+                del model[:count]
+            else:
+                self.assertEqual(tree.pop_max(), model.pop())
+            if model:
+                self.assertEqual((tree.min(), tree.max()),
+                                 (model[0], model[-1]))
+            self.assertEqual(len(tree), len(model))
+        check_counts(self, tree)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+File: test_render.py
+Tests for rendering trees and collections with output limits
+"""
+
+import io
+import unittest
+
+from linkedbst import LinkedBST
+from ternarysearchtree import TernarySearchTree
+
+
+class LinkedBSTRenderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = LinkedBST([4, 2, 6, 1, 3, 5, 7])
+
+    def test_whole_tree(self):
+        self.assertEqual(str(self.tree),
+                         "| | 7\n| 6\n| | 5\n4\n| | 3\n| 2\n| | 1\n")
+        self.assertEqual(str(LinkedBST()), "")
+
+    def test_max_depth_elides_deeper_subtrees(self):
+        self.assertEqual(self.tree.render(max_depth=1),
+                         "| | ...\n| 6\n| | ...\n4\n| | ...\n| 2\n| | ...\n")
+        self.assertEqual(self.tree.render(max_depth=0),
+                         "| ...\n4\n| ...\n")
+
+    def test_max_nodes_stops_the_output(self):
+        self.assertEqual(self.tree.render(max_nodes=3),
+                         "| | 7\n| 6\n| | 5\n...\n")
+        self.assertEqual(self.tree.render(max_nodes=0), "...\n")
+        self.assertEqual(self.tree.render(max_nodes=7), str(self.tree))
+
+    def test_writes_to_a_file(self):
+        out = io.StringIO()
+        self.assertIsNone(self.tree.render(out, max_nodes=1))
+        self.assertEqual(out.getvalue(), "| | 7\n...\n")
+
+    def test_limits_are_keyword_only(self):
+        with self.assertRaises(TypeError):
+            self.tree.render(None, 3)
+
+    def test_deep_tree_renders_without_recursion(self):
+        tree = LinkedBST()
+        tree.replace_ordered_list(list(range(5000)))
+        lines = tree.render(max_nodes=2).splitlines()
+        self.assertEqual(lines, ["| " * 4999 + "4999", "| " * 4998 + "4998",
+                                 "..."])
+
+    def test_marks_deleted_items(self):
+        self.tree.enable_lazy_delete(0.9)
+        self.tree.remove(4)
+        self.assertIn("4 (deleted)\n", str(self.tree))
+
+
+class CollectionRenderTest(unittest.TestCase):
+
+    def test_max_nodes(self):
+        words = TernarySearchTree(["b", "a", "c"])
+        self.assertEqual(str(words), "[a, b, c]")
+        self.assertEqual(words.render(max_nodes=2), "[a, b, ...]")
+        self.assertEqual(words.render(max_nodes=0), "[...]")
+        out = io.StringIO()
+        words.render(out, max_nodes=1)
+        self.assertEqual(out.getvalue(), "[a, ...]")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+File: test_sharedbst.py
+Tests for the shared-memory read replicas of the linked trees
+"""
+
+import multiprocessing
+import unittest
+
+from linkedbst import LinkedBST
+from sharedbst import SharedBST
+
+WORDS = ["pear", "apple", "fig", "banana", "cherry", "apple", "äpfel"]
+
+
+def count_in_replica(name, items, queue):
+    """Attach to the replica name in another process and report which
+    of items it holds"""
+    with SharedBST(name) as replica:
+        queue.put([item in replica for item in items])
+
+
+class SharedBSTTest(unittest.TestCase):
+
+    def export(self, tree):
+        replica = tree.export_shared()
+        self.addCleanup(replica.unlink)
+        return replica
+
+    def test_string_queries(self):
+        tree = LinkedBST(WORDS)
+        replica = self.export(tree)
+        self.assertEqual(list(replica), sorted(WORDS))
+        self.assertEqual(len(replica), len(WORDS))
+        for word in WORDS:
+            self.assertEqual(replica.find(word), word)
+        self.assertNotIn("kiwi", replica)
+        self.assertEqual(replica.rank("banana"), tree.rank("banana"))
+        self.assertEqual(replica.successor("apple"), "banana")
+        self.assertIsNone(replica.predecessor("apple"))
+        self.assertEqual(replica.predecessor("zebra"), "pear")
+        self.assertEqual(replica.successor("zebra"), "äpfel")
+        self.assertIsNone(replica.successor("äpfel"))
+        self.assertEqual(replica.range_find("b", "g"),
+                         ["banana", "cherry", "fig"])
+
+    def test_non_string_lookups_in_a_string_replica(self):
+        replica = self.export(LinkedBST(WORDS))
+        self.assertIsNone(replica.find(3))
+        self.assertNotIn(3, replica)
+        with self.assertRaises(TypeError):
+            replica.rank(3)
+        with self.assertRaises(TypeError):
+            replica.range_find(1, "b")
+        empty = self.export(LinkedBST())
+        self.assertNotIn(3, empty)
+        self.assertEqual(empty.range_find(1, 2), [])
+
+    def test_pickled_keys(self):
+        items = [(2, "b"), (1, "a"), (3, "c"), (2, "a")]
+        replica = self.export(LinkedBST(items))
+        self.assertEqual(list(replica), sorted(items))
+        self.assertEqual(replica.find((2, "a")), (2, "a"))
+        self.assertIsNone(replica.find((4, "a")))
+        self.assertEqual(replica.range_find((2, ""), (2, "z")),
+                         [(2, "a"), (2, "b")])
+
+    def test_key_function(self):
+        tree = LinkedBST(["Pear", "apple", "Fig"], key=str.lower)
+        replica = self.export(tree)
+        self.assertEqual(list(replica), ["apple", "Fig", "Pear"])
+        with SharedBST(replica.name, key=str.lower) as other:
+            self.assertEqual(other.find("FIG"), "Fig")
+            self.assertEqual(other.successor("fig"), "Pear")
+        with self.assertRaises(ValueError):
+            SharedBST(replica.name)
+
+    def test_skips_deleted_items(self):
+        tree = LinkedBST(range(10))
+        tree.enable_lazy_delete(0.9)
+        tree.remove(4)
+        replica = self.export(tree)
+        self.assertEqual(list(replica), [0, 1, 2, 3, 5, 6, 7, 8, 9])
+
+    def test_is_a_snapshot(self):
+        tree = LinkedBST([1, 2])
+        replica = self.export(tree)
+        tree.add(3)
+        self.assertNotIn(3, replica)
+
+    def test_close_and_unlink(self):
+        replica = LinkedBST([1, 2]).export_shared()
+        other = SharedBST(replica.name)
+        with self.assertRaises(RuntimeError):
+            other.unlink()
+        other.close()
+        other.close()
+        replica.close()
+        replica.unlink()
+        replica.unlink()
+        with self.assertRaises(FileNotFoundError):
+            SharedBST(replica.name)
+
+    def test_other_process_reads_the_replica(self):
+        replica = self.export(LinkedBST(WORDS))
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=count_in_replica,
+            args=(replica.name, ["fig", "kiwi", "äpfel"], queue))
+        process.start()
+        self.assertEqual(queue.get(timeout=30), [True, False, True])
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
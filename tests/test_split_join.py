@@ -0,0 +1,65 @@
+"""
+File: test_split_join.py
+Tests for splitting and joining linked trees
+"""
+
+import unittest
+
+from linkedbst import LinkedBST
+from scapegoatbst import ScapegoatBST
+from splaybst import SplayBST
+from test_trees import check_counts
+
+
+class SplitJoinTest(unittest.TestCase):
+
+    def test_split_sizes(self):
+        for tree_type in (LinkedBST, SplayBST, ScapegoatBST):
+            for cut in range(-1, 12):
+                tree = tree_type([5, 2, 8, 1, 3, 7, 9, 0, 4, 6, 5])
+                left, right = tree.split(cut)
+                expected = sorted([5, 2, 8, 1, 3, 7, 9, 0, 4, 6, 5])
+                self.assertEqual(list(left.inorder()),
+                                 [item for item in expected if item < cut])
+                self.assertEqual(list(right.inorder()),
+                                 [item for item in expected if item >= cut])
+                self.assertEqual(len(left) + len(right), len(expected))
+                self.assertIs(type(left), tree_type)
+                self.assertEqual(len(tree), 0)
+                check_counts(self, left)
+                check_counts(self, right)
+
+    def test_split_keeps_duplicates_together(self):
+        left, right = LinkedBST([3, 5, 5, 5, 7]).split(5)
+        self.assertEqual(list(left.inorder()), [3])
+        self.assertEqual(list(right.inorder()), [5, 5, 5, 7])
+
+    def test_join_sizes(self):
+        for low, high in ((10, 40), (40, 10), (1, 30), (30, 0)):
+            left = LinkedBST(range(low))
+            right = LinkedBST(range(100, 100 + high))
+            joined = LinkedBST.join(left, right)
+            self.assertEqual(list(joined.inorder()),
+                             list(range(low)) + list(range(100, 100 + high)))
+            self.assertEqual(len(joined), low + high)
+            self.assertEqual((len(left), len(right)), (0, 0))
+            check_counts(self, joined)
+            self.assertEqual(joined.rank(100), low)
+
+    def test_join_after_split_restores_the_items(self):
+        tree = LinkedBST([4, 2, 6, 1, 3, 5, 7])
+        left, right = tree.split(4)
+        joined = LinkedBST.join(left, right)
+        self.assertEqual(list(joined.inorder()), [1, 2, 3, 4, 5, 6, 7])
+        check_counts(self, joined)
+
+    def test_join_rejects_overlapping_trees(self):
+        left, right = LinkedBST([1, 5]), LinkedBST([3, 9])
+        with self.assertRaises(ValueError):
+            LinkedBST.join(left, right)
+        self.assertEqual(list(left.inorder()), [1, 5])
+        self.assertEqual(list(right.inorder()), [3, 9])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+"""
+File: test_trees.py
+Behavioral tests shared by the search tree implementations
+"""
+
+import random
+import unittest
+from bisect import insort
+
+from bplustree import BPlusTree
+from linkedbst import LinkedBST
+from scapegoatbst import ScapegoatBST
+from splaybst import SplayBST
+
+# Items with many duplicates
+ITEMS = [5, 3, 8, 3, 1, 9, 5, 5, 7, 2, 8, 0, 3]
+
+
+class TreeBehavior(object):
+    """Tests every tree must pass. Subclasses define make()."""
+
+    def make(self, items=None):
+        """Return a new tree holding items"""
+        raise NotImplementedError
+
+    def assertHolds(self, tree, model):
+        """Check that tree holds exactly the items of the sorted model"""
+        self.assertEqual(list(tree.inorder()), model)
+        self.assertEqual(len(tree), len(model))
+
+    def test_add_and_find_with_duplicates(self):
+        tree = self.make(ITEMS)
+        self.assertHolds(tree, sorted(ITEMS))
+        for item in ITEMS:
+            self.assertEqual(tree.find(item), item)
+            self.assertIn(item, tree)
+        self.assertIsNone(tree.find(4))
+        self.assertNotIn(10, tree)
+
+    def test_remove_duplicates_one_at_a_time(self):
+        tree = self.make(ITEMS)
+        model = sorted(ITEMS)
+        for _ in range(ITEMS.count(3)):
+            self.assertEqual(tree.remove(3), 3)
+            model.remove(3)
+            self.assertHolds(tree, model)
+        self.assertNotIn(3, tree)
+        with self.assertRaises(KeyError):
+            tree.remove(3)
+        self.assertHolds(tree, model)
+
+    def test_replace(self):
+        tree = self.make(ITEMS)
+        self.assertEqual(tree.replace(5, 5), 5)
+        self.assertIsNone(tree.replace(4, 4))
+        self.assertHolds(tree, sorted(ITEMS))
+        # The stored item is returned, not the argument
+        self.assertIs(type(tree.replace(5.0, 5.0)), int)
+        self.assertIs(type(tree.replace(5.0, 5)), float)
+
+    def test_range_find_is_inclusive_and_sorted(self):
+        tree = self.make(ITEMS)
+        self.assertEqual(tree.range_find(3, 5), [3, 3, 3, 5, 5, 5])
+        self.assertEqual(tree.range_find(4, 4), [])
+        self.assertEqual(tree.range_find(-5, 20), sorted(ITEMS))
+
+    def test_successor_and_predecessor_skip_equal_items(self):
+        tree = self.make(ITEMS)
+        self.assertEqual(tree.successor(3), 5)
+        self.assertEqual(tree.successor(4), 5)
+        self.assertIsNone(tree.successor(9))
+        self.assertEqual(tree.predecessor(5), 3)
+        self.assertEqual(tree.predecessor(6), 5)
+        self.assertIsNone(tree.predecessor(0))
+
+    def test_matches_a_sorted_list(self):
+        rng = random.Random(31)
+        tree = self.make()
+        model = []
+        for _ in range(800):
+            value = rng.randint(0, 25)
+            choice = rng.random()
+            if choice < 0.45:
+                tree.add(value)
+                insort(model, value)
+            elif choice < 0.85:
+                if value in model:
+                    self.assertEqual(tree.remove(value), value)
+                    model.remove(value)
+                else:
+                    with self.assertRaises(KeyError):
+                        tree.remove(value)
+            else:
+                expected = value if value in model else None
+                self.assertEqual(tree.replace(value, value), expected)
+            self.assertHolds(tree, model)
+            self.assertEqual(tree.find(value) is not None, value in model)
+            low, high = sorted(rng.randint(0, 25) for _ in range(2))
+            self.assertEqual(tree.range_find(low, high),
+                             [item for item in model if low <= item <= high])
+            larger = [item for item in model if item > value]
+            smaller = [item for item in model if item < value]
+            self.assertEqual(tree.successor(value),
+                             larger[0] if larger else None)
+            self.assertEqual(tree.predecessor(value),
+                             smaller[-1] if smaller else None)
+
+
+class LinkedBSTTest(TreeBehavior, unittest.TestCase):
+
+    def make(self, items=None):
+        return LinkedBST(items)
+
+
+class LazyLinkedBSTTest(TreeBehavior, unittest.TestCase):
+
+    def make(self, items=None):
+        tree = LinkedBST(items)
+        tree.enable_lazy_delete()
+        return tree
+
+
+class SplayBSTTest(TreeBehavior, unittest.TestCase):
+
+    def make(self, items=None):
+        return SplayBST(items)
+
+
+class ScapegoatBSTTest(TreeBehavior, unittest.TestCase):
+
+    def make(self, items=None):
+        return ScapegoatBST(items)
+
+
+class BPlusTreeTest(TreeBehavior, unittest.TestCase):
+
+    def make(self, items=None):
+        # A small fanout gives several levels even for few items
+        return BPlusTree(items, fanout=4)
+
+
+def check_counts(test, tree):
+    """Check the subtree sizes and live counts of every node of tree"""
+    def count(node):
+        if node is None:
+            return 0, 0
+        left, right = count(node.left), count(node.right)
+        size = 1 + left[0] + right[0]
+        live = (not node.dead) + left[1] + right[1]
+        test.assertEqual((node.size, node.live), (size, live))
+        return size, live
+
+    size, live = count(tree._root)
+    test.assertEqual(live, len(tree))
+    test.assertEqual(size - live, tree._tombstones)
+
+
+if __name__ == "__main__":
+    unittest.main()
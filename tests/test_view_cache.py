@@ -0,0 +1,85 @@
+"""
+File: test_view_cache.py
+Tests for the sorted view and height cached between writes
+"""
+
+import unittest
+from unittest import mock
+
+from linkedbst import LinkedBST
+from splaybst import SplayBST
+
+
+class SortedViewTest(unittest.TestCase):
+
+    def test_reads_share_one_view_between_writes(self):
+        tree = LinkedBST([5, 3, 8, 1])
+        with mock.patch.object(LinkedBST, "_flatten",
+                               wraps=LinkedBST._flatten) as flatten:
+            self.assertEqual(list(tree.inorder()), [1, 3, 5, 8])
+            self.assertEqual(tree.range_find(2, 6), [3, 5])
+            self.assertEqual(tree.range_find(0, 4), [1, 3])
+            self.assertEqual(list(tree.inorder()), [1, 3, 5, 8])
+            self.assertEqual(flatten.call_count, 1)
+
+    def test_second_range_find_builds_the_view(self):
+        tree = LinkedBST([5, 3, 8, 1])
+        with mock.patch.object(LinkedBST, "_flatten",
+                               wraps=LinkedBST._flatten) as flatten:
+            self.assertEqual(tree.range_find(2, 6), [3, 5])
+            self.assertEqual(flatten.call_count, 0)
+            self.assertEqual(tree.range_find(2, 6), [3, 5])
+            self.assertEqual(tree.range_find(8, 9), [8])
+            self.assertEqual(flatten.call_count, 1)
+
+    def test_every_write_invalidates_the_view(self):
+        tree = LinkedBST([5, 3, 8, 1])
+        writes = [(lambda: tree.add(4), [1, 3, 4, 5, 8]),
+                  (lambda: tree.remove(3), [1, 4, 5, 8]),
+                  (lambda: tree.replace(5, 5.0), [1, 4, 5, 8]),
+                  (lambda: tree.add_many([0, 9]), [0, 1, 4, 5, 8, 9]),
+                  (lambda: tree.pop_min(2), [4, 5, 8, 9]),
+                  (lambda: tree.pop_max(), [4, 5, 8]),
+                  (lambda: tree.clear(), [])]
+        for write, model in writes:
+            list(tree.inorder())
+            tree.range_find(0, 100)
+            write()
+            self.assertEqual(list(tree.inorder()), model)
+            self.assertEqual(tree.range_find(0, 100), model)
+
+    def test_view_survives_splaying(self):
+        tree = SplayBST()
+        tree.replace_ordered_list(list(range(200)))
+        view = list(tree.inorder())
+        items = tree._view_items
+        self.assertEqual(tree.find(199), 199)
+        self.assertEqual(list(tree.inorder()), view)
+        self.assertIs(tree._view_items, items)
+
+
+class HeightCacheTest(unittest.TestCase):
+
+    def test_height_follows_the_shape(self):
+        tree = LinkedBST()
+        tree.replace_ordered_list(list(range(15)))
+        self.assertEqual(tree.height(), 14)
+        tree.add(20)
+        self.assertEqual(tree.height(), 15)
+        tree.rebalance()
+        self.assertEqual(tree.height(), 4)
+        tree.replace(7, 7.0)
+        self.assertEqual(tree.height(), 4)
+
+    def test_height_survives_reads_but_not_splaying(self):
+        tree = SplayBST()
+        tree.replace_ordered_list(list(range(200)))
+        self.assertEqual(tree.height(), 199)
+        tree.range_find(3, 8)
+        self.assertEqual(tree.height(), 199)
+        tree.find(199)
+        self.assertLess(tree.height(), 199)
+
+
+if __name__ == "__main__":
+    unittest.main()
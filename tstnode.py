@@ -0,0 +1,16 @@
+"""
+File: tstnode.py
+"""
+
+class TSTNode(object):
+    """Represents a node for a ternary search tree."""
+
+    def __init__(self, char):
+        self.char = char
+        self.lo = None
+        self.eq = None
+        self.hi = None
+        # Number of words ending at self
+        self.ends = 0
+        # Number of words going through self along the eq links
+        self.count = 0